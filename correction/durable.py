@@ -0,0 +1,188 @@
+import ctypes
+import ctypes.util
+import os
+import tempfile
+from enum import Enum
+
+# A batch is committed once it holds this many files or bytes
+BATCH_FILES = 256
+BATCH_BYTES = 256 * 1024 * 1024
+
+
+class Durability(Enum):
+    # Written in place, flushing is left to the kernel
+    NONE = "none"
+    # Temporary names, one sync and one rename per file for the whole batch
+    BATCH = "batch"
+    # Temporary names, each file is synced and renamed on its own
+    FULL = "full"
+
+
+def _load_syncfs():
+    """Return libc's syncfs, or None where it does not exist"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        func = libc.syncfs
+    except (OSError, AttributeError, TypeError):
+        return None
+    func.argtypes = [ctypes.c_int]
+    func.restype = ctypes.c_int
+    return func
+
+
+_syncfs = _load_syncfs()
+
+
+def sync_filesystem(path: str) -> bool:
+    """Write back the whole filesystem holding path, False if not possible"""
+    if _syncfs is None:
+        return False
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return _syncfs(fd) == 0
+    finally:
+        os.close(fd)
+
+
+def fsync_path(path: str) -> None:
+    """Flush a file to disk by its path"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_directory(path: str) -> None:
+    """Make the renames done in a directory durable"""
+    # Windows cannot open directories, its renames are journaled anyway
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class DurableWriter:
+    def __init__(self, batch_files: int = BATCH_FILES, batch_bytes: int = BATCH_BYTES):
+        """
+        Publish files under their final name only once their data is on disk.
+
+        Files are written under a temporary name in the target directory.
+        In batch mode, the data of a whole batch is synced at once, with
+        syncfs where available, then every file is renamed and each parent
+        directory is synced a single time. A crash leaves either the previous
+        file or the complete new one, never a truncated one.
+
+        :param batch_files: Number of pending files triggering a commit.
+        :param batch_bytes: Number of pending bytes triggering a commit.
+        """
+        self.batch_files = batch_files
+        self.batch_bytes = batch_bytes
+        self.pending = []
+        self.pending_bytes = 0
+        self.directories = set()
+        self.failures = []
+
+    @staticmethod
+    def temp_for(target: str) -> str:
+        """Create an empty temporary file next to target"""
+        directory, name = os.path.split(os.path.abspath(target))
+        fd, temp = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+        os.close(fd)
+        return temp
+
+    def add(self, temp: str, target: str, durability: Durability, then=None) -> None:
+        """
+        Rename the written file temp to target once it is durable.
+
+        :param then: Called once target is durable, e.g. to remove the source
+            of a move.
+        """
+        target = os.path.abspath(target)
+        if durability is Durability.FULL:
+            try:
+                fsync_path(temp)
+                os.replace(temp, target)
+            except OSError:
+                if os.path.exists(temp):
+                    os.remove(temp)
+                raise
+            fsync_directory(os.path.dirname(target))
+            if then is not None:
+                then()
+            return
+        self.pending.append((temp, target, then))
+        self.pending_bytes += os.path.getsize(temp)
+        if (
+            len(self.pending) >= self.batch_files
+            or self.pending_bytes >= self.batch_bytes
+        ):
+            self.commit()
+
+    def renamed(self, paths, durability: Durability) -> None:
+        """Make renames done in place durable, e.g. a move on one device"""
+        directories = {os.path.dirname(os.path.abspath(path)) for path in paths}
+        if durability is Durability.FULL:
+            for directory in directories:
+                fsync_directory(directory)
+        else:
+            self.directories.update(directories)
+
+    def commit(self) -> None:
+        """Sync, rename and publish every pending file"""
+        pending = self.pending
+        try:
+            self._sync_data(pending)
+        except OSError as e:
+            # None of the batch is known to be on disk, none of it is published
+            for temp, target, _ in pending:
+                self.failures.append((target, e))
+                try:
+                    os.remove(temp)
+                except OSError:
+                    pass
+            return
+        finally:
+            self.pending, self.pending_bytes = [], 0
+        done = []
+        for temp, target, then in pending:
+            try:
+                os.replace(temp, target)
+            except OSError as e:
+                self.failures.append((target, e))
+                os.remove(temp)
+                continue
+            self.directories.add(os.path.dirname(target))
+            done.append((target, then))
+        directories, self.directories = self.directories, set()
+        for directory in directories:
+            fsync_directory(directory)
+        # Sources are only removed once their copy survives a crash
+        for target, then in done:
+            if then is not None:
+                try:
+                    then()
+                except OSError as e:
+                    self.failures.append((target, e))
+
+    def flush(self) -> list:
+        """Commit the current batch, return the (target, error) failures"""
+        if self.pending or self.directories:
+            self.commit()
+        failures, self.failures = self.failures, []
+        return failures
+
+    @staticmethod
+    def _sync_data(pending) -> None:
+        """Flush the data of pending files, once per filesystem if possible"""
+        devices = {}
+        for temp, target, _ in pending:
+            devices.setdefault(os.stat(temp).st_dev, []).append(temp)
+        for temps in devices.values():
+            # Below a few files, fsync is cheaper than writing back everything
+            if len(temps) < 4 or not sync_filesystem(os.path.dirname(temps[0])):
+                for temp in temps:
+                    fsync_path(temp)
@@ -0,0 +1,231 @@
+import ctypes
+import ctypes.util
+import errno
+import hashlib
+import os
+import shutil
+
+BUFFER_SIZE = 8 * 1024 * 1024
+FLUSH_BATCH = 64 * 1024 * 1024
+# Largest chunk written at once when the copy is paced
+PACED_CHUNK = 1024 * 1024
+
+SYNC_FILE_RANGE_WAIT_BEFORE = 1
+SYNC_FILE_RANGE_WRITE = 2
+SYNC_FILE_RANGE_WAIT_AFTER = 4
+
+ZEROS = bytes(1024 * 1024)
+
+
+def _load_sync_file_range():
+    """Return libc's sync_file_range, or None where it does not exist"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        func = libc.sync_file_range
+    except (OSError, AttributeError, TypeError):
+        return None
+    func.argtypes = [ctypes.c_int, ctypes.c_int64, ctypes.c_int64, ctypes.c_uint]
+    func.restype = ctypes.c_int
+    return func
+
+
+_sync_file_range = _load_sync_file_range()
+
+
+def sync_range(fd: int, offset: int, length: int, flags: int) -> None:
+    """Write back a range of fd, falling back to fdatasync when waiting"""
+    if _sync_file_range is not None:
+        if _sync_file_range(fd, offset, length, flags) == 0:
+            return
+        error = ctypes.get_errno()
+        if error not in (errno.EINVAL, errno.ENOSYS, errno.ESPIPE):
+            raise OSError(error, os.strerror(error))
+    if flags & SYNC_FILE_RANGE_WAIT_AFTER:
+        getattr(os, "fdatasync", os.fsync)(fd)
+
+
+def advise(fd: int, offset: int, length: int, advice_name: str) -> None:
+    """Give a posix_fadvise hint, ignored where unsupported"""
+    advice = getattr(os, advice_name, None)
+    if advice is None:
+        return
+    try:
+        os.posix_fadvise(fd, offset, length, advice)
+    except OSError:
+        pass
+
+
+def data_extents(fd: int, size: int):
+    """Yield the (start, end) ranges of fd holding data, skipping holes"""
+    st = os.fstat(fd)
+    # Fully allocated files have no hole worth looking for
+    if not hasattr(os, "SEEK_DATA") or st.st_blocks * 512 >= size:
+        if size:
+            yield 0, size
+        return
+    offset = 0
+    while offset < size:
+        try:
+            start = os.lseek(fd, offset, os.SEEK_DATA)
+        except OSError as e:
+            if e.errno == errno.ENXIO:  # Only a hole is left
+                return
+            if offset == 0:  # The filesystem cannot report holes
+                yield 0, size
+                return
+            raise
+        end = min(os.lseek(fd, start, os.SEEK_HOLE), size)
+        yield start, end
+        offset = end
+
+
+def hash_zeros(digest, count: int) -> None:
+    """Update digest with count zero bytes"""
+    while count > 0:
+        digest.update(ZEROS[:count])
+        count -= len(ZEROS)
+
+
+def destination_path(src: str, dest: str) -> str:
+    """Resolve dest like shutil.copy does when it is a directory"""
+    if os.path.isdir(dest):
+        return os.path.join(dest, os.path.basename(src))
+    return dest
+
+
+class StreamCopier:
+    def __init__(
+        self,
+        buffer_size: int = BUFFER_SIZE,
+        flush_batch: int = FLUSH_BATCH,
+        drop_cache: bool = True,
+    ):
+        """
+        Copy only the data extents of files, keeping holes sparse.
+
+        :param buffer_size: Size of the buffer reused by every copy.
+        :param flush_batch: Number of bytes written between two writebacks.
+        :param drop_cache: Evict the copied ranges from the page cache. When
+            False, data is copied in the kernel with copy_file_range.
+        """
+        self.buffer = bytearray(buffer_size)
+        self.flush_batch = max(flush_batch, buffer_size)
+        self.drop_cache = drop_cache
+        self._kernel_copy = not drop_cache and hasattr(os, "copy_file_range")
+
+    def copy(self, src: str, dest: str, digest=None, progress=None) -> str:
+        """
+        Copy src to dest, holes included.
+
+        :param digest: hashlib object updated with the content of src while
+            it is copied, holes being hashed as the zeros they read as.
+        :param progress: Called with the size of each chunk before it is
+            written, chunks being at most PACED_CHUNK bytes and the buffer.
+        """
+        dest = destination_path(src, dest)
+        fsrc = open(src, "rb", buffering=0)
+        with fsrc, open(dest, "wb", buffering=0) as fdst:
+            src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+            size = os.fstat(src_fd).st_size
+            if self.drop_cache:
+                advise(src_fd, 0, 0, "POSIX_FADV_SEQUENTIAL")
+            batch_start = hashed = 0
+            pending = None
+            for start, end in data_extents(src_fd, size):
+                if digest is not None:
+                    hash_zeros(digest, start - hashed)
+                offset = start
+                while offset < end:
+                    count = end - offset
+                    if progress is not None:
+                        count = min(count, PACED_CHUNK, len(self.buffer))
+                        progress(count)
+                    copied = self._transfer(fsrc, fdst, offset, count, digest)
+                    if not copied:  # The source shrank while being copied
+                        break
+                    offset += copied
+                    if self.drop_cache and offset - batch_start >= self.flush_batch:
+                        pending = self._flush(
+                            src_fd, dst_fd, pending, batch_start, offset
+                        )
+                        batch_start = offset
+                hashed = offset
+            if digest is not None:
+                hash_zeros(digest, size - hashed)
+            # Recreates the trailing hole, if any
+            fdst.truncate(size)
+            if self.drop_cache:
+                if pending is not None:
+                    self._drop(src_fd, dst_fd, *pending)
+                if size > batch_start:
+                    self._drop(src_fd, dst_fd, batch_start, size)
+        shutil.copystat(src, dest)
+        return dest
+
+    def digest(self, path: str) -> str:
+        """Hash a file as stored on disk rather than as left in the cache"""
+        digest = hashlib.blake2b()
+        view = memoryview(self.buffer)
+        with open(path, "rb", buffering=0) as f:
+            fd = f.fileno()
+            # Dirty pages cannot be evicted, they have to reach the disk first
+            os.fsync(fd)
+            advise(fd, 0, 0, "POSIX_FADV_DONTNEED")
+            advise(fd, 0, 0, "POSIX_FADV_SEQUENTIAL")
+            offset = 0
+            while read := f.readinto(view):
+                digest.update(view[:read])
+                advise(fd, offset, read, "POSIX_FADV_DONTNEED")
+                offset += read
+        return digest.hexdigest()
+
+    def _transfer(self, fsrc, fdst, offset: int, count: int, digest=None) -> int:
+        """Copy up to count bytes at offset, return the number copied"""
+        # Hashing needs the data in user space, which copy_file_range avoids
+        if self._kernel_copy and digest is None:
+            try:
+                copied = os.copy_file_range(
+                    fsrc.fileno(), fdst.fileno(), count, offset, offset
+                )
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL):
+                    raise
+                self._kernel_copy = False
+            else:
+                # Some filesystems report 0 instead of failing, only a read
+                # can tell that the source really ended
+                if copied:
+                    return copied
+        view = memoryview(self.buffer)[:count]
+        fsrc.seek(offset)
+        read = fsrc.readinto(view)
+        if digest is not None:
+            digest.update(view[:read])
+        fdst.seek(offset)
+        written = 0
+        while written < read:
+            written += fdst.write(view[written:read])
+        return read
+
+    def _flush(self, src_fd, dst_fd, pending, start, end):
+        """Start writeback of [start, end) and retire the previous batch"""
+        # The previous batch had a whole batch worth of time to reach the
+        # disk, so waiting on it is cheap while this one is being written
+        sync_range(dst_fd, start, end - start, SYNC_FILE_RANGE_WRITE)
+        if pending is not None:
+            self._drop(src_fd, dst_fd, *pending)
+        return (start, end)
+
+    @staticmethod
+    def _drop(src_fd, dst_fd, start, end):
+        """Wait for a copied range to be on disk and evict it on both ends"""
+        sync_range(
+            dst_fd,
+            start,
+            end - start,
+            SYNC_FILE_RANGE_WAIT_BEFORE
+            | SYNC_FILE_RANGE_WRITE
+            | SYNC_FILE_RANGE_WAIT_AFTER,
+        )
+        advise(src_fd, start, end - start, "POSIX_FADV_DONTNEED")
+        advise(dst_fd, start, end - start, "POSIX_FADV_DONTNEED")
@@ -1,31 +1,188 @@
+import hashlib
 import os
 import shutil
 from ui import ConsoleUI
-from futils import FileSelector, FileExplorer, FileSystem, FileManager
+from futils import FileSelector, FileExplorer, FileSystem, FileStat, FileManager
+from throttle import ThrottledFileSystem, same_device
+from fcopy import StreamCopier, destination_path
+from durable import Durability, DurableWriter
+from snapshot import Snapshotter
 
 
 class StdFileSystem(FileSystem):
-    def copy(src: str, dest: str) -> None:
-        """Copy a file from src to dest"""
-        if os.path.exists(src):
+    def __init__(
+        self, cache_friendly: bool = False, durability: Durability = Durability.NONE
+    ):
+        """
+        FileSystem over the local os and shutil modules.
+
+        :param cache_friendly: Stream file copies through one reused buffer
+            and drop them from the page cache.
+        :param durability: Default durability of copies and moves.
+        """
+        self.copier = StreamCopier(drop_cache=cache_friendly)
+        self.snapshotter = Snapshotter()
+        self.durability = durability
+        self.writer = DurableWriter()
+
+    def listdir(self, path: str) -> list[FileStat]:
+        """List a directory with its entries' size and mtime"""
+        entries = []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append(
+                    FileStat(entry.name, st.st_size, st.st_mtime, entry.is_dir())
+                )
+        return entries
+
+    def stat(self, path: str) -> FileStat:
+        st = os.stat(path)
+        name = os.path.basename(os.path.normpath(path))
+        return FileStat(name, st.st_size, st.st_mtime, os.path.isdir(path))
+
+    def open_read(self, path: str):
+        return open(path, "rb")
+
+    def open_write(self, path: str):
+        return open(path, "wb")
+
+    def makedirs(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+
+    def join(self, directory: str, name: str) -> str:
+        return os.path.join(directory, name)
+
+    def copy(
+        self,
+        src: str,
+        dest: str,
+        verify: bool = False,
+        durability: str = None,
+        progress=None,
+    ) -> None:
+        """Copy a file from src to dest, keeping sparse files sparse"""
+        durability = Durability(durability or self.durability)
+        if os.path.isfile(src) and durability is not Durability.NONE:
+            target = destination_path(src, dest)
+            temp = self._stage(src, target, verify, progress)
+            self.writer.add(temp, target, durability)
+        elif os.path.isfile(src):
+            self._copy_file(src, dest, verify, progress)
+        elif os.path.exists(src):
             shutil.copy2(src, dest)
 
-    def move(src: str, dest: str) -> None:
+    def _copy_file(self, src: str, dest: str, verify: bool, progress=None) -> str:
+        """Copy a regular file, checking the copy against the source if asked"""
+        if verify:
+            # The source is hashed while it streams, only dest is read again
+            digest = hashlib.blake2b()
+            target = self.copier.copy(src, dest, digest, progress)
+            if self.copier.digest(target) != digest.hexdigest():
+                raise ValueError(f"{os.path.basename(src)}: checksum mismatch")
+            return target
+        return self.copier.copy(src, dest, progress=progress)
+
+    def _stage(self, src: str, target: str, verify=False, progress=None) -> str:
+        """Copy src next to target under a temporary name"""
+        temp = self.writer.temp_for(target)
+        try:
+            self._copy_file(src, temp, verify, progress)
+        except BaseException:
+            os.remove(temp)
+            raise
+        return temp
+
+    def move(
+        self, src: str, dest: str, durability: str = None, progress=None
+    ) -> None:
         """Move a file from src to dest"""
-        if os.path.exists(src):
-            shutil.move(src, dest)
+        durability = Durability(durability or self.durability)
+        if not os.path.isfile(src) or durability is Durability.NONE:
+            if os.path.exists(src):
+                # Only used when the move crosses devices
+                shutil.move(
+                    src,
+                    dest,
+                    copy_function=lambda s, d: self._copy_file(s, d, False, progress),
+                )
+            return
+        target = destination_path(src, dest)
+        if target != dest and os.path.lexists(target):
+            # Like shutil.move, never replace an entry of a destination folder
+            raise shutil.Error(f"Destination path '{target}' already exists")
+        if same_device(src, dest):
+            os.replace(src, target)
+            self.writer.renamed([src, target], durability)
+        else:
+            # The source stays until its copy has reached the disk
+            temp = self._stage(src, target, progress=progress)
+            self.writer.add(temp, target, durability, then=lambda: os.remove(src))
+
+    def flush(self) -> list:
+        """Commit the pending durable batch"""
+        return self.writer.flush()
 
-    def delete(path: str) -> None:
+    def delete(self, path: str) -> None:
         """Delete a file"""
         if os.path.isfile(path):
             os.remove(path)
         elif os.path.isdir(path):
             shutil.rmtree(path)
 
+    def snapshot(self, src: str, dest: str, link_dest: str = None) -> None:
+        """Snapshot src into the directory dest, reflinking or copying its files"""
+        name = os.path.basename(os.path.normpath(src))
+        previous = os.path.join(link_dest, name) if link_dest else None
+        self.snapshotter.snapshot(src, os.path.join(dest, name), previous)
+
+
+def ask_durability():
+    """Ask the durability of one operation, None for the default one"""
+    answer = input("Durability (none/batch/full, empty for batch): ")
+    return Durability(answer.strip().lower()) if answer.strip() else None
+
+
+def ask_rate(prompt):
+    """Ask a transfer limit, None for unlimited"""
+    answer = input(prompt).strip()
+    if not answer:
+        return None
+    rate = int(answer)
+    if rate <= 0:
+        raise ValueError("Limits must be positive, leave empty for unlimited")
+    return rate
+
+
+def object_store():
+    """S3-compatible backend configured by the environment, None if not set"""
+    endpoint = os.environ.get("S3_ENDPOINT")
+    if not endpoint:
+        return None
+    from s3fs import S3FileSystem
+
+    return S3FileSystem(
+        endpoint,
+        os.environ["S3_BUCKET"],
+        os.environ["AWS_ACCESS_KEY_ID"],
+        os.environ["AWS_SECRET_ACCESS_KEY"],
+        os.environ.get("AWS_REGION", "us-east-1"),
+    )
+
 
 def main_menu():
     file_selector = FileSelector()
-    file_manager = FileManager(file_selector, StdFileSystem(), ConsoleUI())
+    file_system = ThrottledFileSystem(
+        StdFileSystem(cache_friendly=True, durability=Durability.BATCH)
+    )
+    file_manager = FileManager(file_selector, file_system, ConsoleUI())
+    remote = object_store()
+    remote_manager = FileManager(
+        file_selector, file_system, ConsoleUI(), dest_fs=remote
+    )
     file_explorer = FileExplorer()
 
     while True:
@@ -37,7 +194,10 @@ def main_menu():
         print("5. Copy")
         print("6. Move")
         print("7. Delete")
-        print("8. Quit")
+        print("8. Snapshot")
+        print("9. Transfer Limits")
+        print("10. Copy to Object Store")
+        print("11. Quit")
 
         choice = input("Your choice: ")
 
@@ -59,12 +219,13 @@ def main_menu():
 
             elif choice == "5":
                 dest = input("Enter destination path for copying: ")
-                count = file_manager.copy_files(dest)
+                verify = input("Verify copies? (y/N): ").strip().lower() == "y"
+                count = file_manager.copy_files(dest, verify, ask_durability())
                 print(f"{count} file(s) copied")
 
             elif choice == "6":
                 dest = input("Enter destination path for moving: ")
-                count = file_manager.move_files(dest)
+                count = file_manager.move_files(dest, ask_durability())
                 print(f"{count} file(s) moved")
 
             elif choice == "7":
@@ -72,6 +233,33 @@ def main_menu():
                 print(f"{count} file(s)/folder(s) deleted")
 
             elif choice == "8":
+                dest = input("Enter destination path for the snapshot: ")
+                previous = input("Previous snapshot (empty for a full one): ")
+                count = file_manager.snapshot_files(dest, previous or None)
+                print(f"{count} file(s)/folder(s) snapshotted")
+
+            elif choice == "9":
+                limits = (
+                    ask_rate("Bytes per second (empty for unlimited): "),
+                    ask_rate("Operations per second (empty for unlimited): "),
+                )
+                dest = input("Only for destination (empty for all): ")
+                if dest:
+                    file_system.set_destination_limit(dest, *limits)
+                else:
+                    file_system.set_limits(*limits)
+
+            elif choice == "10":
+                if remote is None:
+                    print("Set S3_ENDPOINT and S3_BUCKET to use an object store")
+                    continue
+                dest = input("Enter destination prefix (empty for the root): ")
+                count = remote_manager.copy_files(dest or "/")
+                print(f"{count} file(s)/folder(s) uploaded")
+
+            elif choice == "11":
+                if remote is not None:
+                    remote.close()
                 print("Goodbye!")
                 break
 
@@ -1,10 +1,15 @@
 import os
-from typing import Callable
+import shutil
+from typing import Callable, NamedTuple
 from .ui import UserInterface
+from .listing import ListingStore, Selection, KIND_DIR, KIND_FILE
+
+# Chunk read from one backend and written to the other by transfers
+TRANSFER_CHUNK = 8 * 1024 * 1024
 
 
 class FileListProvider:
-    def subset(indices: list[int]) -> list[str]:
+    def subset(indices: list[int]) -> Selection:
         pass
 
 
@@ -13,24 +18,67 @@ class FileSelection:
         pass
 
 
+class FileStat(NamedTuple):
+    name: str
+    size: int
+    mtime: float
+    is_dir: bool
+
+
 class FileSystem:
-    def copy(src: str, dest: str) -> None:
+    def listdir(path: str) -> list[FileStat]:
+        pass
+
+    def stat(path: str) -> FileStat:
+        pass
+
+    def open_read(path: str):
+        pass
+
+    def open_write(path: str):
+        pass
+
+    def makedirs(path: str) -> None:
+        pass
+
+    def join(directory: str, name: str) -> str:
+        pass
+
+    def copy(
+        src: str,
+        dest: str,
+        verify: bool = False,
+        durability: str = None,
+        progress: Callable[[int], None] = None,
+    ) -> None:
         pass
 
-    def move(src: str, dest: str) -> None:
+    def move(
+        src: str,
+        dest: str,
+        durability: str = None,
+        progress: Callable[[int], None] = None,
+    ) -> None:
         pass
 
     def delete(path: str) -> None:
         pass
 
+    def snapshot(src: str, dest: str, link_dest: str = None) -> None:
+        pass
+
+    def flush(self) -> list[tuple[str, Exception]]:
+        """Commit pending durable writes, return the (path, error) failures"""
+        return []
+
 
 class FileSelector(FileSelection):
     def __init__(self):
-        self.selected_files = []
+        self.selected_files = Selection()
 
     def select_files_by_indices(
         self, indices: list[int], file_explorer: FileListProvider
-    ) -> list[str]:
+    ) -> Selection:
         """Select files based on indices"""
         try:
             selected_indices = [int(i.strip()) for i in indices.split(",")]
@@ -51,28 +99,40 @@ class FileSelector(FileSelection):
 
     def get_and_reset(self) -> list[str]:
         """Return the list of currently selected files"""
-        res = self.selected_files.copy()
-        self.selected_files.clear()
+        # Paths are only built now, when the operation needs them
+        res = self.selected_files.paths()
+        self.selected_files = Selection()
         return res
 
 
 class FileExplorer(FileListProvider):
-    def __init__(self):
-        self._set_current_path(os.path.expanduser("~"))
+    def __init__(self, fs: FileSystem = None, path: str = None):
+        """Explore the local disk from home, or the backend fs from its root"""
+        self.fs = fs
+        if path is None:
+            path = os.path.expanduser("~") if fs is None else "/"
+        self._set_current_path(path)
 
     def _set_current_path(self, path: str) -> None:
         """Set current path and update the contents of the current directory"""
         self.current_path = path
-        self.current_directory_contents = os.listdir(self.current_path)
+        if self.fs is None:
+            self.current_directory_contents = ListingStore.scan(self.current_path)
+            return
+        contents = ListingStore(path)
+        for entry in self.fs.listdir(path):
+            kind = KIND_DIR if entry.is_dir else KIND_FILE
+            contents.append(entry.name, kind, entry.size, entry.mtime)
+        self.current_directory_contents = contents
 
     def display_directory_contents(self) -> None:
         """Display contents of the current directory"""
         try:
             print(f"\nCurrent Directory: {self.current_path}")
             print("-" * 50)
-            for index, element in enumerate(self.current_directory_contents):
-                full_path = os.path.join(self.current_path, element)
-                element_type = "📁 Folder" if os.path.isdir(full_path) else "📄 File"
+            contents = self.current_directory_contents
+            for index, element in enumerate(contents):
+                element_type = "📁 Folder" if contents.is_dir(index) else "📄 File"
                 print(f"{index}. {element_type}: {element}")
         except PermissionError:
             print("Access denied to this directory.")
@@ -83,9 +143,9 @@ class FileExplorer(FileListProvider):
         """Navigate to a subdirectory"""
         try:
             selected_element = self.current_directory_contents[index]
-            full_path = os.path.join(self.current_path, selected_element)
+            full_path = self.current_directory_contents.path(index)
 
-            if os.path.isdir(full_path):
+            if self.current_directory_contents.is_dir(index):
                 self._set_current_path(full_path)
                 self.display_directory_contents()
             else:
@@ -98,20 +158,29 @@ class FileExplorer(FileListProvider):
         self._set_current_path(os.path.dirname(self.current_path))
         self.display_directory_contents()
 
-    def subset(self, indices: list[int]) -> list[str]:
+    def subset(self, indices: list[int]) -> Selection:
         """Return a subset of the current directory contents"""
-        selected_files = []
-        for index in indices:
-            if 0 <= index < len(self.current_directory_contents):
-                full_path = os.path.join(
-                    self.current_path, self.current_directory_contents[index]
-                )
-                selected_files.append(full_path)
-        return selected_files
+        contents = self.current_directory_contents
+        return Selection(
+            contents, [index for index in indices if 0 <= index < len(contents)]
+        )
+
+
+def transfer(src_fs: FileSystem, src: str, dest_fs: FileSystem, dest: str) -> None:
+    """Copy src into the directory dest of another backend, streaming the data"""
+    entry = src_fs.stat(src)
+    target = dest_fs.join(dest, entry.name)
+    if entry.is_dir:
+        dest_fs.makedirs(target)
+        for child in src_fs.listdir(src):
+            transfer(src_fs, src_fs.join(src, child.name), dest_fs, target)
+        return
+    with src_fs.open_read(src) as fsrc, dest_fs.open_write(target) as fdst:
+        shutil.copyfileobj(fsrc, fdst, TRANSFER_CHUNK)
 
 
 class FileManager:
-    def __init__(self, sel, fs, ui, destination=None):
+    def __init__(self, sel, fs, ui, destination=None, dest_fs=None):
         """
         Constructeur du FileManager.
 
@@ -119,11 +188,17 @@ class FileManager:
         :param fs: Instance de la classe de gestion du système de fichiers.
         :param ui: Instance de la classe de l'interface utilisateur.
         :param destination: Le répertoire de destination où les fichiers seront copiés/déplacés.
+        :param dest_fs: Backend de destination, s'il diffère de celui de la sélection.
         """
         self.sel = sel
         self.fs = fs
         self.ui = ui
         self.destination = destination
+        self.dest_fs = dest_fs
+
+    @property
+    def cross_backend(self) -> bool:
+        return self.dest_fs is not None and self.dest_fs is not self.fs
 
     def validate_destination(self, destination):
         """
@@ -135,6 +210,17 @@ class FileManager:
             self.ui.error("Destination path is not provided")
             return False
 
+        if self.cross_backend:
+            try:
+                is_dir = self.dest_fs.stat(destination).is_dir
+            except FileNotFoundError:
+                self.ui.error("Destination path does not exist")
+                return False
+            if not is_dir:
+                self.ui.error("Destination path is not a directory")
+                return False
+            return True
+
         if not os.path.exists(destination):
             self.ui.error("Destination path does not exist")
             return False
@@ -146,9 +232,13 @@ class FileManager:
         return True
 
     def _process_files(
-        self, title: str, action: Callable[[str, str], None], destination: str = None
+        self,
+        title: str,
+        action: Callable[[str, str], None],
+        destination: str = None,
+        flush: bool = False,
     ) -> int:
-        """Process files based on the action"""
+        """Process files based on the action, flushing the writes if asked"""
         count = 0
         selected_files = self.sel.get_and_reset()
         for file in selected_files:
@@ -158,16 +248,72 @@ class FileManager:
                     count += 1  # Incrément si aucune exception
             except Exception as e:
                 self.ui.error(f"{title}: {e}")
+        if not flush:
+            return count
+        # Files of a durable batch are only published by the flush
+        target_fs = self.dest_fs if self.cross_backend else self.fs
+        try:
+            failures = target_fs.flush() or ()
+        except Exception as e:
+            # Whatever the batch held is not known to be published
+            self.ui.error(f"{title}: {e}")
+            return 0
+        for _, error in failures:
+            self.ui.error(f"{title}: {error}")
+            count -= 1
         return count
 
-    def copy_files(self, destination) -> int:
-        """Copy selected files"""
+    def copy_files(self, destination, verify=False, durability=None) -> int:
+        """Copy selected files, only counting verified ones if asked"""
         # Vérifier si le chemin de destination existe
-        return self._process_files("Copy", self.fs.copy, destination)
-
-    def move_files(self, destination) -> int:
-        """Move selected files"""
-        return self._process_files("Move", self.fs.move, destination)
+        if self.cross_backend:
+            return self._process_files(
+                "Copy",
+                lambda path, dest: transfer(self.fs, path, self.dest_fs, dest),
+                destination,
+                flush=True,
+            )
+        options = {}
+        if verify:
+            options["verify"] = True
+        if durability is not None:
+            options["durability"] = durability
+        if options:
+            return self._process_files(
+                "Copy",
+                lambda path, dest: self.fs.copy(path, dest, **options),
+                destination,
+                flush=True,
+            )
+        return self._process_files("Copy", self.fs.copy, destination, flush=True)
+
+    def move_files(self, destination, durability=None) -> int:
+        """Move selected files, with the given durability if any"""
+        if self.cross_backend:
+            return self._process_files(
+                "Move", self._move_across, destination, flush=True
+            )
+        if durability is not None:
+            return self._process_files(
+                "Move",
+                lambda path, dest: self.fs.move(path, dest, durability=durability),
+                destination,
+                flush=True,
+            )
+        return self._process_files("Move", self.fs.move, destination, flush=True)
+
+    def _move_across(self, path, destination) -> None:
+        """Move to another backend, the source going once the copy is done"""
+        transfer(self.fs, path, self.dest_fs, destination)
+        self.fs.delete(path)
+
+    def snapshot_files(self, destination, link_dest=None) -> int:
+        """Snapshot selected files with links, optionally against a previous one"""
+        return self._process_files(
+            "Snapshot",
+            lambda path, dest: self.fs.snapshot(path, dest, link_dest),
+            destination,
+        )
 
     def delete_files(self) -> int:
         """Delete selected files"""
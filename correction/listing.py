@@ -0,0 +1,133 @@
+import os
+import sys
+from array import array
+
+ENCODING = sys.getfilesystemencoding()
+ENCODE_ERRORS = sys.getfilesystemencodeerrors()
+
+KIND_FILE = 0
+KIND_DIR = 1
+KIND_OTHER = 2
+
+
+class ListingStore:
+    def __init__(self, directory=""):
+        """
+        Directory listing packed in a few buffers instead of one str per name.
+
+        Names are stored encoded back to back in one buffer with an offsets
+        array, and their type, size and mtime in array columns. Paths are
+        only built when asked for.
+
+        :param directory: Directory shared by every entry.
+        """
+        self.directory = directory
+        self._names = bytearray()
+        self._offsets = array("Q", [0])
+        self.kinds = array("b")
+        self.sizes = array("q")
+        self.mtimes = array("d")
+
+    @classmethod
+    def scan(cls, directory, with_stat=False):
+        """List directory with scandir, stat-ing entries only if asked"""
+        store = cls(directory)
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                store.append_entry(entry, with_stat)
+        return store
+
+    @classmethod
+    def from_names(cls, directory, names):
+        """Build a store from plain names, or full paths with no directory"""
+        store = cls(directory)
+        for name in names:
+            store.append(name)
+        return store
+
+    def append(self, name, kind=KIND_OTHER, size=-1, mtime=-1.0):
+        self._names += os.fsencode(name)
+        self._offsets.append(len(self._names))
+        self.kinds.append(kind)
+        self.sizes.append(size)
+        self.mtimes.append(mtime)
+
+    def append_entry(self, entry, with_stat=False):
+        """Append a scandir entry, its type coming for free from the listing"""
+        try:
+            if entry.is_dir():
+                kind = KIND_DIR
+            elif entry.is_file():
+                kind = KIND_FILE
+            else:
+                kind = KIND_OTHER
+        except OSError:
+            kind = KIND_OTHER
+        size, mtime = -1, -1.0
+        if with_stat:
+            try:
+                st = entry.stat()
+                size, mtime = st.st_size, st.st_mtime
+            except OSError:
+                pass
+        self.append(entry.name, kind, size, mtime)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("listing index out of range")
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._names[start:end].decode(ENCODING, ENCODE_ERRORS)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __eq__(self, other):
+        if isinstance(other, ListingStore):
+            return self._offsets == other._offsets and self._names == other._names
+        return list(self) == other
+
+    def index(self, name):
+        """Return the index of a name, like list.index"""
+        for index, element in enumerate(self):
+            if element == name:
+                return index
+        raise ValueError(f"{name!r} is not in listing")
+
+    def path(self, index):
+        """Return the full path of an entry"""
+        return os.path.join(self.directory, self[index])
+
+    def is_dir(self, index):
+        return self.kinds[index] == KIND_DIR
+
+
+class Selection:
+    def __init__(self, store=None, indices=()):
+        """Entries of a ListingStore, kept as indices until paths are needed"""
+        self.store = store
+        self.indices = array("I", indices)
+
+    @classmethod
+    def from_paths(cls, paths):
+        """Select arbitrary paths, stored whole in a store of their own"""
+        paths = list(paths)
+        return cls(ListingStore.from_names("", paths), range(len(paths)))
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __iter__(self):
+        for index in self.indices:
+            yield self.store.path(index)
+
+    def paths(self):
+        """Materialize the selected paths"""
+        return list(self)
@@ -0,0 +1,221 @@
+import io
+import posixpath
+import threading
+import time
+from .futils import FileSystem, FileStat
+
+
+def normalize(path: str) -> str:
+    """Absolute POSIX form of a path, the only one used as a key"""
+    return posixpath.normpath("/" + path.replace("\\", "/").lstrip("/"))
+
+
+class MemoryFileSystem(FileSystem):
+    def __init__(self, clock=time.time):
+        """
+        FileSystem kept entirely in memory, for tests and benchmarks.
+
+        File contents are immutable bytes, so copies and snapshots share
+        their data like reflinks do. Paths use "/" and start at "/".
+        """
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.files = {}
+        self.dirs = {"/": clock()}
+        # Names in each directory, so listing does not scan every path
+        self.children = {"/": set()}
+
+    def _require_dir(self, path: str) -> None:
+        if path not in self.dirs:
+            if path in self.files:
+                raise NotADirectoryError(path)
+            raise FileNotFoundError(path)
+
+    def _target(self, src: str, dest: str) -> str:
+        """Resolve dest like shutil.copy does when it is a directory"""
+        if dest in self.dirs:
+            return posixpath.join(dest, posixpath.basename(src))
+        return dest
+
+    def _descendants(self, path: str) -> list[str]:
+        """Every file and directory below path, parents first"""
+        found = []
+        pending = [path]
+        while pending:
+            directory = pending.pop()
+            for name in self.children.get(directory, ()):
+                child = posixpath.join(directory, name)
+                found.append(child)
+                if child in self.dirs:
+                    pending.append(child)
+        return found
+
+    def _add_file(self, path: str, content) -> None:
+        self.files[path] = content
+        self.children[posixpath.dirname(path)].add(posixpath.basename(path))
+
+    def _add_dir(self, path: str, mtime: float) -> None:
+        self.dirs[path] = mtime
+        self.children.setdefault(path, set())
+        self.children[posixpath.dirname(path)].add(posixpath.basename(path))
+
+    def _remove(self, path: str) -> None:
+        """Forget a single file or empty directory"""
+        if self.files.pop(path, None) is None:
+            del self.dirs[path]
+            del self.children[path]
+        self.children[posixpath.dirname(path)].discard(posixpath.basename(path))
+
+    def write(self, path: str, data: bytes) -> None:
+        """Create or replace a file at once"""
+        path = normalize(path)
+        with self._lock:
+            self._require_dir(posixpath.dirname(path))
+            if path in self.dirs:
+                raise IsADirectoryError(path)
+            self._add_file(path, (bytes(data), self._clock()))
+
+    def _content(self, path: str) -> bytes:
+        """Data of the file at path, raising like open() for anything else"""
+        path = normalize(path)
+        try:
+            return self.files[path][0]
+        except KeyError:
+            if path in self.dirs:
+                raise IsADirectoryError(path) from None
+            raise FileNotFoundError(path) from None
+
+    def read(self, path: str) -> bytes:
+        return self._content(path)
+
+    def listdir(self, path: str) -> list[FileStat]:
+        path = normalize(path)
+        with self._lock:
+            self._require_dir(path)
+            entries = []
+            for name in self.children[path]:
+                child = posixpath.join(path, name)
+                if child in self.dirs:
+                    entries.append(FileStat(name, 0, self.dirs[child], True))
+                else:
+                    data, mtime = self.files[child]
+                    entries.append(FileStat(name, len(data), mtime, False))
+            return entries
+
+    def stat(self, path: str) -> FileStat:
+        path = normalize(path)
+        name = posixpath.basename(path)
+        if path in self.dirs:
+            return FileStat(name, 0, self.dirs[path], True)
+        if path in self.files:
+            data, mtime = self.files[path]
+            return FileStat(name, len(data), mtime, False)
+        raise FileNotFoundError(path)
+
+    def open_read(self, path: str):
+        return io.BytesIO(self._content(path))
+
+    def open_write(self, path: str):
+        """Open a file whose content replaces path when closed"""
+        path = normalize(path)
+        self._require_dir(posixpath.dirname(path))
+        return _MemoryWriter(self, path)
+
+    def makedirs(self, path: str) -> None:
+        path = normalize(path)
+        missing = []
+        with self._lock:
+            while path not in self.dirs:
+                if path in self.files:
+                    raise FileExistsError(path)
+                missing.append(path)
+                path = posixpath.dirname(path)
+            for path in reversed(missing):
+                self._add_dir(path, self._clock())
+
+    def join(self, directory: str, name: str) -> str:
+        return posixpath.join(normalize(directory), name)
+
+    def copy(
+        self,
+        src: str,
+        dest: str,
+        verify: bool = False,
+        durability: str = None,
+        progress=None,
+    ) -> None:
+        """Copy a file or directory, sharing the file contents"""
+        src, dest = normalize(src), normalize(dest)
+        with self._lock:
+            target = self._target(src, dest)
+            self._require_dir(posixpath.dirname(target))
+            if src in self.files:
+                self._add_file(target, self.files[src])
+            elif src in self.dirs:
+                self._graft(src, target, keep=True)
+            else:
+                raise FileNotFoundError(src)
+
+    def move(
+        self, src: str, dest: str, durability: str = None, progress=None
+    ) -> None:
+        """Move a file or directory by renaming its keys"""
+        src, dest = normalize(src), normalize(dest)
+        with self._lock:
+            target = self._target(src, dest)
+            self._require_dir(posixpath.dirname(target))
+            if src in self.files:
+                content = self.files[src]
+                self._remove(src)
+                self._add_file(target, content)
+            elif src in self.dirs and src != "/":
+                self._graft(src, target, keep=False)
+            else:
+                raise FileNotFoundError(src)
+
+    def delete(self, path: str) -> None:
+        path = normalize(path)
+        with self._lock:
+            if path in self.files or (path in self.dirs and path != "/"):
+                for child in reversed([path, *self._descendants(path)]):
+                    self._remove(child)
+
+    def _graft(self, src: str, target: str, keep: bool) -> None:
+        """Copy or move the directory src and its tree to target"""
+        if target == src or target.startswith(src + "/"):
+            raise OSError(f"Cannot copy or move {src} into itself")
+        tree = [src, *self._descendants(src)]
+        for path in tree:
+            copied = target + path[len(src) :]
+            if path in self.dirs:
+                self._add_dir(copied, self.dirs[path])
+            else:
+                self._add_file(copied, self.files[path])
+        if not keep:
+            for path in reversed(tree):
+                self._remove(path)
+
+    def snapshot(self, src: str, dest: str, link_dest: str = None) -> None:
+        """Snapshot src into dest, which shares every file content anyway"""
+        self.copy(src, dest)
+
+    def flush(self) -> list:
+        return []
+
+
+class _MemoryWriter(io.BytesIO):
+    def __init__(self, fs: MemoryFileSystem, path: str):
+        super().__init__()
+        self._fs = fs
+        self._path = path
+
+    def close(self) -> None:
+        if not self.closed:
+            self._fs.write(self._path, self.getvalue())
+        super().close()
+
+    def __exit__(self, exc_type, *exc_info):
+        # A failed transfer leaves the previous content in place
+        if exc_type is not None:
+            super().close()
+        return super().__exit__(exc_type, *exc_info)
@@ -0,0 +1,541 @@
+import datetime
+import hashlib
+import hmac
+import http.client
+import io
+import posixpath
+import queue
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from functools import cached_property
+from urllib.parse import quote, urlsplit
+from xml.etree import ElementTree
+from .futils import FileSystem, FileStat
+
+# Size of uploaded parts and downloaded ranges, 5 MiB at least for S3
+PART_SIZE = 8 * 1024 * 1024
+# Server-side copies are limited to 5 GiB, bigger objects are copied in parts
+COPY_LIMIT = 5 * 1024 * 1024 * 1024
+POOL_SIZE = 8
+
+# A kept-alive connection closed by the server fails like this when reused
+STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+def object_key(path: str) -> str:
+    """Key of the object at path, "" for the root of the bucket"""
+    return posixpath.normpath("/" + path.replace("\\", "/")).lstrip("/")
+
+
+def parse_time(text: str) -> float:
+    """Timestamp of an ISO 8601 date from a listing"""
+    return datetime.datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+
+
+def raise_for_status(status: int, body: bytes, key: str) -> None:
+    """Raise the OSError matching an S3 error response"""
+    code = ""
+    if body:
+        try:
+            code = ElementTree.fromstring(body).findtext("Code") or ""
+        except ElementTree.ParseError:
+            pass
+    if status == 404:
+        raise FileNotFoundError(key)
+    if status == 403:
+        raise PermissionError(f"{key}: {code or 'access denied'}")
+    raise OSError(f"{key}: HTTP {status} {code}".rstrip())
+
+
+class ConnectionPool:
+    def __init__(self, endpoint: str, size: int = POOL_SIZE, timeout: float = 60):
+        """
+        Kept-alive HTTP connections to one endpoint, at most size at a time.
+
+        Connections are handed out most recently used first, so idle ones
+        are left to be closed by the server rather than reused stale.
+        """
+        parts = urlsplit(endpoint)
+        self.host = parts.netloc
+        self.timeout = timeout
+        self._factory = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection, waiting while all of them are in use"""
+        with self._slots:
+            try:
+                conn, reused = self._idle.get_nowait(), True
+            except queue.Empty:
+                conn, reused = self._factory(self.host, timeout=self.timeout), False
+            try:
+                yield conn, reused
+            except BaseException:
+                # The connection may be in the middle of a response
+                conn.close()
+                raise
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class S3FileSystem(FileSystem):
+    def __init__(
+        self,
+        endpoint: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+        pool_size: int = POOL_SIZE,
+        part_size: int = PART_SIZE,
+        copy_limit: int = COPY_LIMIT,
+        clock=None,
+    ):
+        """
+        FileSystem over a bucket of an S3-compatible object store.
+
+        Paths are keys with a leading "/", directories being the prefixes
+        ending with "/". Requests are signed with AWS Signature V4 and sent
+        path-style over a pool of kept-alive connections. Files are written
+        with parallel multipart uploads and read with parallel range requests,
+        up to pool_size parts in flight.
+
+        :param endpoint: URL of the service, e.g. http://localhost:9000.
+        :param part_size: Size of the uploaded parts and downloaded ranges.
+        :param copy_limit: Biggest object copied with a single request.
+        """
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.pool_size = pool_size
+        self.part_size = part_size
+        self.copy_limit = copy_limit
+        self.pool = ConnectionPool(endpoint, pool_size)
+        self._clock = clock or (lambda: datetime.datetime.now(datetime.timezone.utc))
+
+    @cached_property
+    def executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(self.pool_size, thread_name_prefix="s3")
+
+    def close(self) -> None:
+        """Stop the transfer threads and close the connections"""
+        if "executor" in self.__dict__:
+            self.executor.shutdown()
+            del self.executor
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _sign(self, method, path, query, headers, body) -> str:
+        """Add the Signature V4 headers, return the canonical query string"""
+        now = self._clock()
+        stamp = now.strftime("%Y%m%dT%H%M%SZ")
+        scope = f"{stamp[:8]}/{self.region}/s3/aws4_request"
+        payload = hashlib.sha256(body).hexdigest()
+        headers.update(
+            {
+                "host": self.pool.host,
+                "x-amz-date": stamp,
+                "x-amz-content-sha256": payload,
+            }
+        )
+        canonical_headers = sorted(
+            (name.lower(), str(value).strip()) for name, value in headers.items()
+        )
+        signed_headers = ";".join(name for name, _ in canonical_headers)
+        canonical_query = "&".join(
+            f"{quote(k, safe='-_.~')}={quote(str(v), safe='-_.~')}"
+            for k, v in sorted(query.items())
+        )
+        canonical = "\n".join(
+            [
+                method,
+                path,
+                canonical_query,
+                "".join(f"{k}:{v}\n" for k, v in canonical_headers),
+                signed_headers,
+                payload,
+            ]
+        )
+        to_sign = "\n".join(
+            [
+                "AWS4-HMAC-SHA256",
+                stamp,
+                scope,
+                hashlib.sha256(canonical.encode()).hexdigest(),
+            ]
+        )
+        key = f"AWS4{self.secret_key}".encode()
+        for part in (stamp[:8], self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(key, to_sign.encode(), hashlib.sha256).hexdigest()
+        headers["Authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+        return canonical_query
+
+    def _request(
+        self, method, key="", query=None, headers=None, body=b"", ok=(200,)
+    ):
+        """Send a signed request on a pooled connection, return its response"""
+        path = quote(f"/{self.bucket}/{key}" if key else f"/{self.bucket}", "/-_.~")
+        for attempt in range(2):
+            sent = dict(headers or {})
+            canonical_query = self._sign(method, path, query or {}, sent, body)
+            target = f"{path}?{canonical_query}" if canonical_query else path
+            try:
+                with self.pool.connection() as (conn, reused):
+                    conn.request(method, target, body=body, headers=sent)
+                    response = conn.getresponse()
+                    data = response.read()
+            except STALE_ERRORS:
+                if attempt or not reused:
+                    raise
+                continue
+            if response.status not in ok:
+                raise_for_status(response.status, data, key)
+            return response, data
+
+    def _list(self, prefix: str, delimiter: str = None):
+        """Yield the (Contents, CommonPrefixes) elements of every listing page"""
+        query = {"list-type": "2", "prefix": prefix}
+        if delimiter:
+            query["delimiter"] = delimiter
+        while True:
+            _, data = self._request("GET", query=query)
+            root = ElementTree.fromstring(data)
+            yield root.iterfind("{*}Contents"), root.iterfind("{*}CommonPrefixes")
+            if root.findtext("{*}IsTruncated") != "true":
+                return
+            query["continuation-token"] = root.findtext("{*}NextContinuationToken")
+
+    def _walk(self, key: str) -> list[tuple[str, int]]:
+        """Every (key, size) below the directory key"""
+        objects = []
+        for contents, _ in self._list(f"{key}/" if key else ""):
+            for item in contents:
+                objects.append((item.findtext("{*}Key"), int(item.findtext("{*}Size"))))
+        return objects
+
+    def listdir(self, path: str) -> list[FileStat]:
+        """List a directory with a single request per thousand entries"""
+        key = object_key(path)
+        prefix = f"{key}/" if key else ""
+        entries = []
+        for contents, prefixes in self._list(prefix, "/"):
+            for item in contents:
+                name = item.findtext("{*}Key")[len(prefix) :]
+                # The marker object of the directory itself
+                if name:
+                    size = int(item.findtext("{*}Size"))
+                    mtime = parse_time(item.findtext("{*}LastModified"))
+                    entries.append(FileStat(name, size, mtime, False))
+            for item in prefixes:
+                name = item.findtext("{*}Prefix")[len(prefix) :].rstrip("/")
+                entries.append(FileStat(name, 0, 0.0, True))
+        if not entries and key and not self.stat(path).is_dir:
+            raise NotADirectoryError(path)
+        return entries
+
+    def stat(self, path: str) -> FileStat:
+        key = object_key(path)
+        name = posixpath.basename(key)
+        if not key:
+            return FileStat(name, 0, 0.0, True)
+        try:
+            response, _ = self._request("HEAD", key)
+            mtime = parsedate_to_datetime(response.getheader("Last-Modified"))
+            size = int(response.getheader("Content-Length"))
+            return FileStat(name, size, mtime.timestamp(), False)
+        except FileNotFoundError:
+            pass
+        _, data = self._request(
+            "GET", query={"list-type": "2", "prefix": f"{key}/", "max-keys": "1"}
+        )
+        if ElementTree.fromstring(data).find("{*}Contents") is None:
+            raise FileNotFoundError(path)
+        return FileStat(name, 0, 0.0, True)
+
+    def open_read(self, path: str):
+        """Open an object, its next parts downloading while one is read"""
+        key = object_key(path)
+        response, _ = self._request("HEAD", key)
+        size = int(response.getheader("Content-Length"))
+        return _ObjectReader(self, key, size, response.getheader("ETag"))
+
+    def open_write(self, path: str):
+        """Open an object, uploaded in parallel parts once big enough"""
+        return _MultipartWriter(self, object_key(path))
+
+    def makedirs(self, path: str) -> None:
+        """Create the marker of an empty directory"""
+        key = object_key(path)
+        if key:
+            self._request("PUT", f"{key}/")
+
+    def join(self, directory: str, name: str) -> str:
+        return posixpath.join("/" + object_key(directory), name)
+
+    def _target(self, src: str, dest: str) -> str:
+        """Resolve dest like shutil.copy does when it is a directory"""
+        try:
+            is_dir = self.stat(dest).is_dir
+        except FileNotFoundError:
+            is_dir = False
+        name = posixpath.basename(object_key(src))
+        return posixpath.join(object_key(dest), name) if is_dir else object_key(dest)
+
+    def copy(
+        self,
+        src: str,
+        dest: str,
+        verify: bool = False,
+        durability: str = None,
+        progress=None,
+    ) -> None:
+        """Copy within the bucket on the server, without moving the data"""
+        key, target = object_key(src), self._target(src, dest)
+        entry = self.stat(src)
+        if entry.is_dir:
+            jobs = [(k, target + k[len(key) :], size) for k, size in self._walk(key)]
+        else:
+            jobs = [(key, target, entry.size)]
+        for future in [self.executor.submit(self._copy_object, *job) for job in jobs]:
+            future.result()
+
+    def _copy_object(self, key: str, target: str, size: int) -> None:
+        source = quote(f"/{self.bucket}/{key}", safe="/-_.~")
+        if size <= self.copy_limit:
+            self._request("PUT", target, headers={"x-amz-copy-source": source})
+            return
+        # Parts are copied by the calling thread, the pool may be busy with
+        # the other objects of the same copy
+        upload_id = self._create_upload(target)
+        try:
+            etags = []
+            for number, start in enumerate(range(0, size, self.part_size), 1):
+                end = min(start + self.part_size, size) - 1
+                response, _ = self._request(
+                    "PUT",
+                    target,
+                    query={"partNumber": str(number), "uploadId": upload_id},
+                    headers={
+                        "x-amz-copy-source": source,
+                        "x-amz-copy-source-range": f"bytes={start}-{end}",
+                    },
+                )
+                etags.append(response.getheader("ETag"))
+            self._complete_upload(target, upload_id, etags)
+        except BaseException:
+            self._abort_upload(target, upload_id)
+            raise
+
+    def move(
+        self, src: str, dest: str, durability: str = None, progress=None
+    ) -> None:
+        """Copy on the server, then delete the source"""
+        self.copy(src, dest)
+        self.delete(src)
+
+    def delete(self, path: str) -> None:
+        """Delete an object, or every object below a directory"""
+        key = object_key(path)
+        if not key:
+            return
+        try:
+            self._request("HEAD", key)
+            keys = [key]
+        except FileNotFoundError:
+            keys = [k for k, _ in self._walk(key)]
+        futures = [
+            self.executor.submit(self._request, "DELETE", k, ok=(200, 204))
+            for k in keys
+        ]
+        for future in futures:
+            future.result()
+
+    def snapshot(self, src: str, dest: str, link_dest: str = None) -> None:
+        """Snapshot src into dest with server-side copies"""
+        self.copy(src, dest)
+
+    def flush(self) -> list:
+        return []
+
+    def _create_upload(self, key: str) -> str:
+        _, data = self._request("POST", key, query={"uploads": ""})
+        return ElementTree.fromstring(data).findtext("{*}UploadId")
+
+    def _upload_part(self, key: str, upload_id: str, number: int, data) -> str:
+        response, _ = self._request(
+            "PUT",
+            key,
+            query={"partNumber": str(number), "uploadId": upload_id},
+            body=data,
+        )
+        return response.getheader("ETag")
+
+    def _complete_upload(self, key: str, upload_id: str, etags: list) -> None:
+        parts = "".join(
+            f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>"
+            for number, etag in enumerate(etags, 1)
+        )
+        body = f"<CompleteMultipartUpload>{parts}</CompleteMultipartUpload>".encode()
+        _, data = self._request("POST", key, query={"uploadId": upload_id}, body=body)
+        # Completion can fail after the status line was already sent
+        root = ElementTree.fromstring(data)
+        if root.tag.rpartition("}")[2] == "Error":
+            raise_for_status(500, data, key)
+
+    def _abort_upload(self, key: str, upload_id: str) -> None:
+        try:
+            self._request(
+                "DELETE", key, query={"uploadId": upload_id}, ok=(200, 204)
+            )
+        except OSError:
+            pass
+
+    def _get_range(self, key: str, start: int, end: int, etag: str) -> bytes:
+        headers = {"Range": f"bytes={start}-{end - 1}"}
+        if etag:
+            # Parts of a replaced object must not be mixed with the old ones
+            headers["If-Match"] = etag
+        _, data = self._request("GET", key, headers=headers, ok=(200, 206))
+        return data
+
+
+class _ObjectReader(io.RawIOBase):
+    def __init__(self, fs: S3FileSystem, key: str, size: int, etag: str):
+        self._fs = fs
+        self._key = key
+        self._size = size
+        self._etag = etag
+        self._next = 0
+        self._parts = deque()
+        self._chunk = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._chunk:
+            self._prefetch()
+            if not self._parts:
+                return 0
+            self._chunk = memoryview(self._parts.popleft().result())
+        read = min(len(buffer), len(self._chunk))
+        buffer[:read] = self._chunk[:read]
+        self._chunk = self._chunk[read:]
+        return read
+
+    def _prefetch(self) -> None:
+        """Keep pool_size ranges downloading ahead of the reader"""
+        fs = self._fs
+        while len(self._parts) < fs.pool_size and self._next < self._size:
+            end = min(self._next + fs.part_size, self._size)
+            self._parts.append(
+                fs.executor.submit(
+                    fs._get_range, self._key, self._next, end, self._etag
+                )
+            )
+            self._next = end
+
+    def close(self) -> None:
+        for future in self._parts:
+            future.cancel()
+        self._parts.clear()
+        super().close()
+
+
+class _MultipartWriter(io.RawIOBase):
+    def __init__(self, fs: S3FileSystem, key: str):
+        self._fs = fs
+        self._key = key
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._parts = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        part_size = self._fs.part_size
+        while len(self._buffer) >= part_size:
+            self._upload(bytes(self._buffer[:part_size]))
+            del self._buffer[:part_size]
+        return len(data)
+
+    def _upload(self, data: bytes) -> None:
+        """Start uploading one part, with at most pool_size parts in memory"""
+        fs = self._fs
+        if self._upload_id is None:
+            self._upload_id = fs._create_upload(self._key)
+        running = [future for future in self._parts if not future.done()]
+        if len(running) >= fs.pool_size:
+            wait(running, return_when=FIRST_COMPLETED)
+        number = len(self._parts) + 1
+        self._parts.append(
+            fs.executor.submit(
+                fs._upload_part, self._key, self._upload_id, number, data
+            )
+        )
+
+    def close(self) -> None:
+        """Finish the upload, the object only appears now"""
+        if self.closed:
+            return
+        try:
+            if self._upload_id is None:
+                self._fs._request("PUT", self._key, body=bytes(self._buffer))
+            else:
+                if self._buffer:
+                    self._upload(bytes(self._buffer))
+                etags = [future.result() for future in self._parts]
+                self._fs._complete_upload(self._key, self._upload_id, etags)
+        except BaseException:
+            self.abort()
+            raise
+        finally:
+            super().close()
+
+    def abort(self) -> None:
+        """Drop the upload, leaving any previous object in place"""
+        for future in self._parts:
+            future.cancel()
+        # Parts still uploading would otherwise outlive the upload
+        wait(self._parts)
+        if self._upload_id is not None:
+            self._fs._abort_upload(self._key, self._upload_id)
+            self._upload_id = None
+        self._buffer.clear()
+        super().close()
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is not None:
+            self.abort()
+        return super().__exit__(exc_type, *exc_info)
@@ -0,0 +1,170 @@
+import errno
+import os
+import shutil
+import stat
+import uuid
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# ioctl cloning a whole file on btrfs, XFS, bcachefs...
+FICLONE = 0x40049409
+
+# Errors meaning "links are not possible here", not "the copy failed"
+LINK_ERRORS = (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.EOPNOTSUPP)
+# Errors meaning "these filesystems cannot share extents", kept per device
+REFLINK_ERRORS = (errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY)
+
+
+class Snapshotter:
+    def __init__(self):
+        """
+        Recreate trees with reflinks instead of copying bytes where possible.
+
+        Each file is cloned with a reflink where the filesystem supports it
+        and copied otherwise. Files unchanged since a previous snapshot are
+        hardlinked to it. Nothing is ever linked to the live source, whose
+        in-place edits would otherwise rewrite the snapshot. FIFOs and device
+        nodes are recreated, never opened, and sockets are skipped. Counters
+        of each kind are kept in `stats`.
+        """
+        self.stats = {"reflink": 0, "copy": 0, "previous": 0, "special": 0}
+        self.skipped = []
+        self._reflink_devices = {}
+
+    def snapshot(self, src: str, dest: str, link_dest: str = None) -> None:
+        """
+        Snapshot the file or directory src to the path dest.
+
+        :param link_dest: Previous snapshot of src. Files unchanged since then
+            are hardlinked to it and the others get an independent copy, like
+            rsync --link-dest.
+        """
+        st = os.stat(src, follow_symlinks=False)
+        if os.path.isdir(src) and not os.path.islink(src):
+            self._snapshot_dir(src, dest, link_dest)
+        else:
+            previous = self._previous_entries(os.path.dirname(link_dest or ""))
+            dest_dev = os.stat(os.path.dirname(dest) or ".").st_dev
+            self._snapshot_file(src, st, dest, dest_dev, link_dest, previous)
+
+    def _snapshot_dir(self, src, dest, link_dest):
+        """Snapshot a directory and everything below it"""
+        os.makedirs(dest, exist_ok=True)
+        dest_dev = os.stat(dest).st_dev
+        previous = self._previous_entries(link_dest)
+        with os.scandir(src) as entries:
+            for entry in entries:
+                target = os.path.join(dest, entry.name)
+                prev = os.path.join(link_dest, entry.name) if link_dest else None
+                if entry.is_dir(follow_symlinks=False):
+                    self._snapshot_dir(entry.path, target, prev)
+                else:
+                    st = entry.stat(follow_symlinks=False)
+                    self._snapshot_file(
+                        entry.path, st, target, dest_dev, prev, previous
+                    )
+        shutil.copystat(src, dest)
+
+    @staticmethod
+    def _previous_entries(link_dest):
+        """Stat a directory of the previous snapshot with a single scandir"""
+        if not link_dest or not os.path.isdir(link_dest):
+            return {}
+        with os.scandir(link_dest) as entries:
+            return {
+                entry.name: entry.stat(follow_symlinks=False)
+                for entry in entries
+                if not entry.is_dir(follow_symlinks=False)
+            }
+
+    def _snapshot_file(self, src, st, dest, dest_dev, prev, previous):
+        """Snapshot a single file, reusing the previous snapshot if unchanged"""
+        if os.path.islink(src):
+            self._publish(dest, lambda temp: os.symlink(os.readlink(src), temp))
+            return
+        if not stat.S_ISREG(st.st_mode):
+            self._snapshot_special(src, st, dest)
+            return
+        old = previous.get(os.path.basename(src)) if prev else None
+        if (
+            old is not None
+            and old.st_size == st.st_size
+            and old.st_mtime_ns == st.st_mtime_ns
+            and self._publish(dest, lambda temp: self._link(prev, temp))
+        ):
+            self.stats["previous"] += 1
+            return
+        devices = (st.st_dev, dest_dev)
+        if self._publish(dest, lambda temp: self._reflink(src, devices, temp)):
+            self.stats["reflink"] += 1
+        else:
+            self._publish(dest, lambda temp: shutil.copy2(src, temp))
+            self.stats["copy"] += 1
+
+    def _snapshot_special(self, src, st, dest):
+        """Recreate a FIFO or device node, opening it could block forever"""
+        if stat.S_ISSOCK(st.st_mode):
+            # A socket only exists while its server runs
+            self.skipped.append(src)
+            return
+
+        def make(temp):
+            if stat.S_ISFIFO(st.st_mode):
+                os.mkfifo(temp, stat.S_IMODE(st.st_mode))
+            else:
+                os.mknod(temp, st.st_mode, st.st_rdev)
+
+        try:
+            self._publish(dest, make)
+        except PermissionError:
+            # Device nodes can only be made with privileges
+            self.skipped.append(src)
+            return
+        self.stats["special"] += 1
+
+    @staticmethod
+    def _publish(dest, make) -> bool:
+        """Build dest under a temporary name with make, then swap it in"""
+        # An existing dest may share its inode with a live file, so it is
+        # replaced as a whole and never opened for writing
+        directory, name = os.path.split(dest)
+        temp = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            if make(temp) is False:
+                return False
+            os.replace(temp, dest)
+            return True
+        finally:
+            if os.path.lexists(temp):
+                os.remove(temp)
+
+    @staticmethod
+    def _link(src, dest) -> bool:
+        """Hardlink dest to src, False when links cannot be used"""
+        try:
+            os.link(src, dest)
+            return True
+        except OSError as e:
+            if e.errno in LINK_ERRORS:
+                return False
+            raise
+
+    def _reflink(self, src, devices, dest) -> bool:
+        """Clone src into dest, remembering devices without reflink support"""
+        if fcntl is None or self._reflink_devices.get(devices) is False:
+            return False
+        try:
+            with open(src, "rb") as fsrc, open(dest, "xb") as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError as e:
+            # Other errors, e.g. EACCES or ENOSPC, are about this file only
+            if e.errno not in REFLINK_ERRORS:
+                raise
+            self._reflink_devices[devices] = False
+            return False
+        shutil.copystat(src, dest)
+        self._reflink_devices[devices] = True
+        return True
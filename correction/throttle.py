@@ -0,0 +1,248 @@
+import os
+import threading
+import time
+from .futils import FileSystem
+
+# Longest single sleep, so that rate changes apply quickly to waiting jobs
+MAX_WAIT = 0.25
+
+
+class TokenBucket:
+    def __init__(
+        self, rate=None, capacity=None, clock=time.monotonic, sleep=time.sleep
+    ):
+        """
+        Token bucket refilled at `rate` tokens per second.
+
+        :param rate: Tokens per second, None means unlimited.
+        :param capacity: Maximum burst size, defaults to one second of tokens.
+        :param clock: Monotonic clock returning seconds.
+        :param sleep: Function used to wait for tokens.
+        :raises ValueError: If rate or capacity is not positive.
+        """
+        self._check(rate, capacity)
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._sleep = sleep
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity or 0
+        self._stamp = clock()
+
+    @staticmethod
+    def _check(rate, capacity) -> None:
+        """Reject limits that would never let a token through"""
+        if rate is not None and rate <= 0:
+            raise ValueError(f"Rate must be positive, None for unlimited: {rate}")
+        if capacity is not None and capacity <= 0:
+            raise ValueError(f"Capacity must be positive: {capacity}")
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last refill"""
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._stamp) * self.rate
+        )
+        self._stamp = now
+
+    def set_rate(self, rate, capacity=None) -> None:
+        """Change the rate, effective immediately even for waiting jobs"""
+        self._check(rate, capacity)
+        with self._lock:
+            limited = self.rate is not None
+            if limited:
+                self._refill()
+            self.rate = rate
+            self.capacity = capacity if capacity is not None else rate
+            if rate is None:
+                self._tokens = 0
+            else:
+                # A bucket that was unlimited starts full
+                tokens = self._tokens if limited else self.capacity
+                self._tokens = min(tokens, self.capacity)
+                self._stamp = self._clock()
+
+    def acquire(self, amount: float = 1) -> None:
+        """Block until `amount` tokens are available, then consume them"""
+        while True:
+            with self._lock:
+                if self.rate is None:
+                    return
+                self._refill()
+                # Requests bigger than the bucket go into debt instead of
+                # waiting forever, the next requests pay it back
+                needed = min(amount, self.capacity)
+                if self._tokens >= needed:
+                    self._tokens -= amount
+                    return
+                wait = (needed - self._tokens) / self.rate
+            self._sleep(min(wait, MAX_WAIT))
+
+    def consume(self, amount: float) -> None:
+        """Wait for `amount` tokens before returning, a bucket at a time"""
+        # Unlike acquire, nothing goes into debt: data is only written once
+        # its whole budget has been earned
+        while amount > 0:
+            piece = min(amount, self.capacity or amount)
+            self.acquire(piece)
+            amount -= piece
+
+
+class ThrottledFileSystem(FileSystem):
+    def __init__(
+        self,
+        fs: FileSystem,
+        bytes_per_second=None,
+        ops_per_second=None,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        """
+        FileSystem limiting the bandwidth and operation rate of another one.
+
+        :param fs: FileSystem performing the actual operations.
+        :param bytes_per_second: Global bandwidth limit, None for unlimited.
+        :param ops_per_second: Global operation limit, None for unlimited.
+        """
+        self.fs = fs
+        self._clock = clock
+        self._sleep = sleep
+        self.bandwidth = TokenBucket(bytes_per_second, clock=clock, sleep=sleep)
+        self.iops = TokenBucket(ops_per_second, clock=clock, sleep=sleep)
+        self.destination_budgets = {}
+
+    def set_limits(self, bytes_per_second=None, ops_per_second=None) -> None:
+        """Change the global limits, also for the running job"""
+        # Both are checked first, so a bad one changes neither
+        for rate in (bytes_per_second, ops_per_second):
+            TokenBucket._check(rate, None)
+        self.bandwidth.set_rate(bytes_per_second)
+        self.iops.set_rate(ops_per_second)
+
+    def set_destination_limit(
+        self, destination: str, bytes_per_second=None, ops_per_second=None
+    ) -> None:
+        """Add or update a budget for everything written below destination"""
+        for rate in (bytes_per_second, ops_per_second):
+            TokenBucket._check(rate, None)
+        key = os.path.abspath(destination)
+        if key in self.destination_budgets:
+            bandwidth, iops = self.destination_budgets[key]
+            bandwidth.set_rate(bytes_per_second)
+            iops.set_rate(ops_per_second)
+        else:
+            self.destination_budgets[key] = (
+                TokenBucket(bytes_per_second, clock=self._clock, sleep=self._sleep),
+                TokenBucket(ops_per_second, clock=self._clock, sleep=self._sleep),
+            )
+
+    def _budget_for(self, dest: str):
+        """Return the budget of the closest configured parent of dest"""
+        path = os.path.abspath(dest)
+        while True:
+            if path in self.destination_budgets:
+                return self.destination_budgets[path]
+            parent = os.path.dirname(path)
+            if parent == path:
+                return None
+            path = parent
+
+    def _throttle(self, size: int, dest: str = None, ops: int = 1) -> None:
+        """Wait for `ops` operations and `size` bytes on every matching budget"""
+        buckets = [(self.bandwidth, self.iops)]
+        budget = self._budget_for(dest) if dest else None
+        if budget:
+            buckets.append(budget)
+        for bandwidth, iops in buckets:
+            if ops:
+                iops.acquire(ops)
+            if size:
+                bandwidth.consume(size)
+
+    def _pacer(self, dest: str = None):
+        """Callback waiting for the bytes of each chunk before it is written"""
+        return lambda size: self._throttle(size, dest, ops=0)
+
+    def listdir(self, path: str) -> list:
+        self._throttle(0)
+        return self.fs.listdir(path)
+
+    def stat(self, path: str):
+        self._throttle(0)
+        return self.fs.stat(path)
+
+    def open_read(self, path: str):
+        """Open path for reading, its data counting against the bandwidth"""
+        self._throttle(0)
+        return ThrottledStream(self.fs.open_read(path), self._pacer())
+
+    def open_write(self, path: str):
+        """Open path for writing, within the budget of its destination"""
+        self._throttle(0, path)
+        return ThrottledStream(self.fs.open_write(path), self._pacer(path))
+
+    def makedirs(self, path: str) -> None:
+        self._throttle(0, path)
+        self.fs.makedirs(path)
+
+    def join(self, directory: str, name: str) -> str:
+        return self.fs.join(directory, name)
+
+    def copy(self, src: str, dest: str, **options) -> None:
+        """Copy a file from src to dest, pacing each chunk within the limits"""
+        self._throttle(0, dest)
+        self.fs.copy(src, dest, progress=self._pacer(dest), **options)
+
+    def move(self, src: str, dest: str, **options) -> None:
+        """Move a file, only pacing bytes when the data has to be copied"""
+        self._throttle(0, dest)
+        self.fs.move(src, dest, progress=self._pacer(dest), **options)
+
+    def snapshot(self, src: str, dest: str, link_dest: str = None) -> None:
+        """Snapshot src within the operation limit"""
+        self._throttle(0, dest)
+        self.fs.snapshot(src, dest, link_dest)
+
+    def delete(self, path: str) -> None:
+        """Delete a file within the operation limit"""
+        self._throttle(0)
+        self.fs.delete(path)
+
+    def flush(self) -> list:
+        """Commit pending durable writes, which are not throttled again"""
+        return self.fs.flush()
+
+
+class ThrottledStream:
+    def __init__(self, stream, throttle):
+        """File object waiting on throttle(size) for the bytes it moves"""
+        self.stream = stream
+        self._throttle = throttle
+
+    def read(self, size: int = -1) -> bytes:
+        # Waiting before the read keeps the source idle while over budget
+        if size > 0:
+            self._throttle(size)
+        return self.stream.read(size)
+
+    def write(self, data) -> int:
+        self._throttle(len(data))
+        return self.stream.write(data)
+
+    def close(self) -> None:
+        self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return self.stream.__exit__(*exc_info)
+
+
+def same_device(src: str, dest: str) -> bool:
+    """Tell whether a move from src to dest is a simple rename"""
+    target = dest if os.path.isdir(dest) else os.path.dirname(dest) or "."
+    try:
+        return os.stat(src).st_dev == os.stat(target).st_dev
+    except OSError:
+        return False
@@ -1,8 +1,8 @@
 class UserInterface:
-    def error(msg: str) -> None:
+    def error(self, msg: str) -> None:
         pass
 
 
 class ConsoleUI(UserInterface):
-    def error(msg: str) -> None:
+    def error(self, msg: str) -> None:
         print(msg)
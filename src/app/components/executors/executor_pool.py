@@ -0,0 +1,143 @@
+import os
+import threading
+
+# Multiple of mmap.ALLOCATIONGRANULARITY, so chunks can be mapped directly
+CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def chunk_ranges(size, chunk_size=CHUNK_SIZE):
+    """Split size bytes into (offset, length) chunks"""
+    return [
+        (offset, min(chunk_size, size - offset))
+        for offset in range(0, size, chunk_size)
+    ]
+
+
+def hash_range(path, offset, length):
+    """Hash a range of a file through mmap, so no data crosses processes"""
+    import hashlib
+    import mmap
+
+    if not length:
+        return hashlib.blake2b().digest()
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ, offset=offset) as m:
+            return hashlib.blake2b(m).digest()
+
+
+class ExecutorPool:
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, processes=None, threads=None):
+        """
+        Pools shared by every component, created on first use.
+
+        :param processes: Size of the process pool for CPU-bound work.
+        :param threads: Size of the thread pool for blocking I/O.
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.threads = threads or min(32, self.processes * 4)
+        self._cpu = None
+        self._io = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        """Return the pool shared by the whole application"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @property
+    def cpu(self):
+        """Process pool for hashing, compression and verification"""
+        with self._lock:
+            if self._cpu is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                # Forking while the I/O threads hold locks can deadlock the
+                # child, workers start from a clean server process instead
+                method = None
+                if "forkserver" in multiprocessing.get_all_start_methods():
+                    method = "forkserver"
+                self._cpu = ProcessPoolExecutor(
+                    self.processes, mp_context=multiprocessing.get_context(method)
+                )
+            return self._cpu
+
+    @property
+    def io(self):
+        """Thread pool for reads and other blocking system calls"""
+        with self._lock:
+            if self._io is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._io = ThreadPoolExecutor(self.threads)
+            return self._io
+
+    def map_cpu(self, function, items):
+        """Map function over items in the process pool, in balanced batches"""
+        items = list(items)
+        chunksize = max(1, len(items) // (4 * self.processes))
+        return self.cpu.map(function, items, chunksize=chunksize)
+
+    def hash_files(self, paths, chunk_size=CHUNK_SIZE):
+        """
+        Hash files in the process pool, large ones split in chunks.
+
+        Every chunk is hashed by a different worker, so a single large file
+        uses every core. The result is a hash of the chunk hashes, None for
+        unreadable files.
+        """
+        jobs = []
+        for path in paths:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                jobs.append(None)
+                continue
+            futures = [
+                self.cpu.submit(hash_range, path, offset, length)
+                for offset, length in chunk_ranges(size, chunk_size) or [(0, 0)]
+            ]
+            jobs.append((size, futures))
+        digests = []
+        for job in jobs:
+            digests.append(None if job is None else self._combine(*job))
+        return digests
+
+    def _combine(self, size, futures):
+        """Combine the chunk hashes of one file, None if one of them failed"""
+        import hashlib
+        from concurrent.futures.process import BrokenProcessPool
+
+        digest = hashlib.blake2b(size.to_bytes(8, "little"))
+        try:
+            for future in futures:
+                digest.update(future.result())
+        # mmap raises ValueError when the file shrank since its size was read
+        except (OSError, ValueError):
+            return None
+        except BrokenProcessPool:
+            # A worker died, e.g. killed for memory, the pool starts over
+            self._discard_cpu()
+            return None
+        return digest.hexdigest()
+
+    def _discard_cpu(self):
+        """Drop a broken process pool, a new one is made on next use"""
+        with self._lock:
+            if self._cpu is not None:
+                self._cpu.shutdown(wait=False, cancel_futures=True)
+                self._cpu = None
+
+    def shutdown(self):
+        """Stop the pools that were started"""
+        with self._lock:
+            for pool in (self._cpu, self._io):
+                if pool is not None:
+                    pool.shutdown()
+            self._cpu = self._io = None
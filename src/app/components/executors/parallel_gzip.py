@@ -0,0 +1,126 @@
+import gzip
+import io
+import zlib
+from collections import deque
+from multiprocessing import shared_memory
+
+BLOCK_SIZE = 1024 * 1024
+GZIP_MAGIC = b"\x1f\x8b"
+# zlib window bits accepting a gzip header and trailer
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+READ_SIZE = 64 * 1024
+
+
+def compress_block(name, length, level):
+    """Compress a shared memory block into a standalone gzip member"""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        return gzip.compress(block.buf[:length], level, mtime=0)
+    finally:
+        block.close()
+
+
+class ParallelGzipWriter:
+    def __init__(self, fileobj, pool, level=6, block_size=BLOCK_SIZE, in_flight=None):
+        """
+        Write-only file compressing blocks in parallel, like pigz.
+
+        Blocks go to the workers through shared memory and come back as
+        independent gzip members, which concatenated form a valid gzip file.
+
+        :param fileobj: File receiving the compressed data.
+        :param pool: ExecutorPool whose process pool compresses the blocks.
+        """
+        self.fileobj = fileobj
+        self.pool = pool
+        self.level = level
+        self.block_size = block_size
+        in_flight = in_flight or pool.processes * 2
+        self._free = [
+            shared_memory.SharedMemory(create=True, size=block_size)
+            for _ in range(in_flight)
+        ]
+        self._blocks = list(self._free)
+        self._pending = deque()
+        self._current = self._free.pop()
+        self._length = 0
+        self.closed = False
+
+    def write(self, data):
+        data = memoryview(data).cast("B")
+        written = 0
+        while written < len(data):
+            room = self.block_size - self._length
+            chunk = data[written : written + room]
+            self._current.buf[self._length : self._length + len(chunk)] = chunk
+            self._length += len(chunk)
+            written += len(chunk)
+            if self._length == self.block_size:
+                self._submit()
+        return written
+
+    def _submit(self):
+        """Send the current block to the pool and take a free one"""
+        future = self.pool.cpu.submit(
+            compress_block, self._current.name, self._length, self.level
+        )
+        self._pending.append((self._current, future))
+        if not self._free:
+            self._collect()
+        self._current = self._free.pop()
+        self._length = 0
+
+    def _collect(self):
+        """Write the oldest compressed block and recycle its buffer"""
+        block, future = self._pending.popleft()
+        self.fileobj.write(future.result())
+        self._free.append(block)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._length:
+                self._submit()
+            while self._pending:
+                self._collect()
+        finally:
+            self.closed = True
+            for block in self._blocks:
+                block.close()
+                block.unlink()
+
+
+class GzipStreamReader(io.RawIOBase):
+    def __init__(self, fileobj):
+        """
+        Read-only file decompressing a gzip stream, member after member.
+
+        Unlike tarfile's stream mode, which stops after the first member,
+        it reads the files written by ParallelGzipWriter from a pipe.
+
+        :param fileobj: Non-seekable file holding the compressed data.
+        """
+        self.fileobj = fileobj
+        self._decoder = zlib.decompressobj(GZIP_WBITS)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while True:
+            if self._decoder.eof:
+                # The next member starts right after the end of this one
+                data = self._decoder.unused_data or self.fileobj.read(READ_SIZE)
+                if not data:
+                    return 0
+                self._decoder = zlib.decompressobj(GZIP_WBITS)
+            else:
+                data = self._decoder.unconsumed_tail or self.fileobj.read(READ_SIZE)
+                if not data:
+                    raise EOFError("Compressed stream ended before its last member")
+            # Bounded, so a highly compressed member is not inflated at once
+            chunk = self._decoder.decompress(data, len(buffer))
+            if chunk:
+                buffer[: len(chunk)] = chunk
+                return len(chunk)
@@ -0,0 +1,273 @@
+import io
+import os
+import shutil
+import stat
+import tarfile
+import tempfile
+import threading
+import uuid
+from collections import deque
+from app.components.executors.executor_pool import ExecutorPool
+from app.components.executors.parallel_gzip import (
+    GZIP_MAGIC,
+    GzipStreamReader,
+    ParallelGzipWriter,
+)
+
+# Files up to this size are read ahead in memory by the reader pool
+SMALL_FILE_SIZE = 1024 * 1024
+COMPRESSIONS = ("", "gz", "bz2", "xz")
+
+
+def walk_entries(paths, names=None):
+    """
+    Yield (path, archive name, stat) for the paths and everything below.
+
+    :param names: Archive name of each path, its base name by default.
+    """
+    for index, path in enumerate(paths):
+        path = os.path.normpath(path)
+        root = os.path.basename(path) if names is None else names[index]
+        stack = [path]
+        while stack:
+            current = stack.pop()
+            st = os.lstat(current)
+            yield current, root + current[len(path) :], st
+            if stat.S_ISDIR(st.st_mode):
+                with os.scandir(current) as entries:
+                    stack.extend(sorted((e.path for e in entries), reverse=True))
+
+
+def read_entry(path, st):
+    """Read a small regular file in memory, None for anything else"""
+    if stat.S_ISREG(st.st_mode) and st.st_size <= SMALL_FILE_SIZE:
+        with open(path, "rb") as f:
+            return f.read()
+    return None
+
+
+def make_tarinfo(path, arcname, st):
+    """Build the tar header from an existing stat, None for special files"""
+    info = tarfile.TarInfo(arcname.replace(os.sep, "/"))
+    info.mode = stat.S_IMODE(st.st_mode)
+    info.mtime = st.st_mtime
+    info.uid, info.gid = st.st_uid, st.st_gid
+    if stat.S_ISREG(st.st_mode):
+        info.size = st.st_size
+    elif stat.S_ISDIR(st.st_mode):
+        info.type = tarfile.DIRTYPE
+    elif stat.S_ISLNK(st.st_mode):
+        info.type = tarfile.SYMTYPE
+        info.linkname = os.readlink(path)
+    else:
+        return None
+    return info
+
+
+class Archiver:
+    def __init__(self, pool=None, read_ahead=64):
+        """
+        Stream files through a tar archive instead of copying them one by one.
+
+        :param pool: ExecutorPool reading files ahead and compressing gzip.
+        :param read_ahead: Maximum number of files read but not yet archived.
+        """
+        self.pool = pool or ExecutorPool.shared()
+        self.read_ahead = read_ahead
+        # (member name, reason) of the entries refused by the last extract
+        self.rejected = []
+
+    def write(self, paths, fileobj, compression="", names=None):
+        """Write the paths as a tar stream into fileobj, return the entry count"""
+        count = 0
+        pending = deque()
+        entries = walk_entries(paths, names)
+        # gzip is compressed on every core, the other formats in this thread
+        output = fileobj
+        if compression == "gz":
+            output = ParallelGzipWriter(fileobj, self.pool)
+            compression = ""
+        try:
+            with tarfile.open(fileobj=output, mode=f"w|{compression}") as tar:
+                # Readers fill the queue while this thread builds the stream
+                for path, arcname, st in entries:
+                    future = self.pool.io.submit(read_entry, path, st)
+                    pending.append((path, arcname, st, future))
+                    if len(pending) >= self.read_ahead:
+                        count += self._add(tar, *pending.popleft())
+                while pending:
+                    count += self._add(tar, *pending.popleft())
+        finally:
+            if output is not fileobj:
+                output.close()
+        return count
+
+    @staticmethod
+    def _add(tar, path, arcname, st, future):
+        """Append one entry to the archive"""
+        info = make_tarinfo(path, arcname, st)
+        if info is None:
+            return 0
+        data = future.result()
+        if info.isreg() and data is None:
+            with open(path, "rb") as f:
+                tar.addfile(info, f)
+        elif info.isreg():
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+        else:
+            tar.addfile(info)
+        return 1
+
+    def copy(self, transfers, destination):
+        """
+        Copy files into the destination directory through a tar pipe.
+
+        The files are extracted in a staging directory inside destination,
+        then each one is swapped into its target like any other transfer.
+
+        :param transfers: Transfers planned by plan_transfers for destination.
+        """
+        from app.components.fileSystem.conflict_policy import install
+
+        names = [os.path.basename(transfer.target) for transfer in transfers]
+        staging = tempfile.mkdtemp(prefix=".archive-", dir=destination)
+        try:
+            count = self._pipe([t.source for t in transfers], names, staging)
+            for transfer, name in zip(transfers, names):
+                staged = os.path.join(staging, name)
+                install(transfer, lambda source, temp: os.replace(staged, temp))
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return count
+
+    def _pipe(self, paths, names, destination):
+        """Extract the paths into destination while they are archived"""
+        read_fd, write_fd = os.pipe()
+        errors = []
+
+        def produce():
+            try:
+                with os.fdopen(write_fd, "wb") as out:
+                    self.write(paths, out, names=names)
+            except Exception as e:
+                errors.append(e)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        with os.fdopen(read_fd, "rb") as source:
+            count = self.extract(source, destination, trusted=True)
+        producer.join()
+        if errors:
+            raise errors[0]
+        return count
+
+    def extract(self, fileobj, destination, trusted=False):
+        """
+        Restore a tar stream into destination, return the entry count.
+
+        Entries are written under a temporary name then renamed, which
+        replaces existing files and symlinks instead of writing through
+        them. Symlinked directories leading out of destination are refused.
+
+        :param trusted: The archive was written by this Archiver, its
+            entries are restored as they are. Otherwise tarfile's data
+            filter checks every entry, and refused ones are skipped and
+            listed in rejected.
+        """
+        destination = os.path.realpath(destination)
+        created = {destination}
+        directories = []
+        count = 0
+        self.rejected = []
+        with self._open_tar(fileobj) as tar:
+            for member in tar:
+                try:
+                    member, target = self._check(member, destination, trusted)
+                    self._make_dirs(os.path.dirname(target), created, destination)
+                    if member.isdir():
+                        self._make_dirs(target, created, destination)
+                except (ValueError, tarfile.TarError) as e:
+                    if trusted:
+                        raise
+                    self.rejected.append((member.name, str(e)))
+                    continue
+                if member.isdir():
+                    directories.append((target, member))
+                elif member.isreg():
+                    self._publish(target, self._write_member, tar, member)
+                elif member.issym():
+                    self._publish(target, os.symlink, member.linkname)
+                else:
+                    continue
+                count += 1
+        # Directory times are set last, once their content stopped changing
+        for target, member in reversed(directories):
+            self._restore_metadata(target, member)
+        return count
+
+    @staticmethod
+    def _check(member, destination, trusted):
+        """Return the member, filtered unless trusted, and its target path"""
+        if not trusted and hasattr(tarfile, "data_filter"):
+            member = tarfile.data_filter(member, destination)
+        target = os.path.join(destination, member.name)
+        if not os.path.abspath(target).startswith(destination + os.sep):
+            raise ValueError(f"Unsafe path in archive: {member.name}")
+        return member, target
+
+    @staticmethod
+    def _open_tar(fileobj):
+        """Open a tar archive for reading, compressed or not"""
+        # Seekable archives go through the gzip module, which reads the
+        # multi-member files written in parallel
+        if fileobj.seekable():
+            return tarfile.open(fileobj=fileobj, mode="r:*")
+        # The stream mode of tarfile stops after the first gzip member
+        if not hasattr(fileobj, "peek"):
+            fileobj = io.BufferedReader(fileobj)
+        if fileobj.peek(2)[:2] == GZIP_MAGIC:
+            fileobj = io.BufferedReader(GzipStreamReader(fileobj))
+            return tarfile.open(fileobj=fileobj, mode="r|")
+        return tarfile.open(fileobj=fileobj, mode="r|*")
+
+    @staticmethod
+    def _write_member(tar, member, temp):
+        """Write the content of a regular member to temp"""
+        with tar.extractfile(member) as src, open(temp, "xb") as dst:
+            shutil.copyfileobj(src, dst)
+        Archiver._restore_metadata(temp, member)
+
+    @staticmethod
+    def _publish(target, make, *args):
+        """Create an entry with make(*args, temp), then rename it to target"""
+        directory, name = os.path.split(target)
+        temp = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            make(*args, temp)
+            os.replace(temp, target)
+        finally:
+            if os.path.lexists(temp):
+                os.remove(temp)
+
+    @staticmethod
+    def _restore_metadata(target, member):
+        """Apply the mode and modification time stored in the archive"""
+        if member.mode is not None:
+            os.chmod(target, member.mode)
+        if member.mtime is not None:
+            os.utime(target, (member.mtime, member.mtime))
+
+    @staticmethod
+    def _make_dirs(path, created, destination):
+        """Create a directory once, remembering every directory already made"""
+        if path in created:
+            return
+        # An existing symlink on the way would create it somewhere else
+        real = os.path.realpath(path)
+        if real != destination and not real.startswith(destination + os.sep):
+            raise ValueError(f"Unsafe path in destination: {path}")
+        os.makedirs(path, exist_ok=True)
+        while path not in created:
+            created.add(path)
+            path = os.path.dirname(path)
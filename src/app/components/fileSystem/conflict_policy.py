@@ -0,0 +1,136 @@
+import os
+import shutil
+import uuid
+from enum import Enum
+from typing import NamedTuple
+
+
+class ConflictPolicy(Enum):
+    SKIP = "skip"
+    OVERWRITE = "overwrite"
+    OVERWRITE_IF_NEWER = "newer"
+    RENAME = "rename"
+
+
+class Transfer(NamedTuple):
+    source: str
+    target: str
+    replaces: bool
+    # Types seen while planning, a directory on either side cannot simply
+    # be renamed over the other entry
+    is_dir: bool = False
+    replaces_dir: bool = False
+
+
+def unique_name(name, taken):
+    """Return name with the first free " (n)" suffix"""
+    stem, ext = os.path.splitext(name)
+    counter = 1
+    while f"{stem} ({counter}){ext}" in taken:
+        counter += 1
+    return f"{stem} ({counter}){ext}"
+
+
+def is_same_file(path, other):
+    """Tell whether two paths lead to the same file"""
+    try:
+        return os.path.samefile(path, other)
+    except OSError:
+        return False
+
+
+def is_real_dir(path):
+    """Tell whether path is a directory, not a link to one"""
+    return os.path.isdir(path) and not os.path.islink(path)
+
+
+def plan_transfers(files, destination, policy):
+    """
+    Resolve every collision with the destination before transferring.
+
+    The destination is scanned once, so the returned transfers can run
+    without checking whether their target exists.
+
+    A file colliding with itself, e.g. copied into its own directory, is
+    always skipped.
+
+    :return: The list of transfers to run and the list of skipped files.
+    """
+    with os.scandir(destination) as entries:
+        existing = {entry.name: entry for entry in entries}
+    # Whether each taken name is a directory, selected files included
+    taken = {
+        name: entry.is_dir(follow_symlinks=False) for name, entry in existing.items()
+    }
+    transfers = []
+    skipped = []
+    for file in files:
+        name = os.path.basename(os.path.normpath(file))
+        replaces = name in taken
+        if replaces:
+            if name in existing and is_same_file(file, existing[name].path):
+                skipped.append(file)
+                continue
+            if policy is ConflictPolicy.SKIP:
+                skipped.append(file)
+                continue
+            if policy is ConflictPolicy.OVERWRITE_IF_NEWER:
+                entry = existing.get(name)
+                # Also skips a second selected file with the same name
+                if entry is None or os.stat(file).st_mtime <= entry.stat().st_mtime:
+                    skipped.append(file)
+                    continue
+            if policy is ConflictPolicy.RENAME:
+                name = unique_name(name, taken)
+                replaces = False
+        is_dir = is_real_dir(file)
+        target = os.path.join(destination, name)
+        transfers.append(
+            Transfer(file, target, replaces, is_dir, replaces and taken[name])
+        )
+        taken[name] = is_dir
+    return transfers, skipped
+
+
+def install(transfer, write):
+    """
+    Write a transfer next to its target, then swap it in.
+
+    The entry being replaced is only removed once the new data is in
+    place, so a failed transfer leaves the destination as it was. A moved
+    source is put back where it was.
+    """
+    directory, name = os.path.split(transfer.target)
+    temp = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        write(transfer.source, temp)
+        if transfer.replaces and (transfer.is_dir or transfer.replaces_dir):
+            # os.replace cannot swap directories, the old one steps aside
+            old = f"{temp}.old"
+            os.replace(transfer.target, old)
+            try:
+                os.replace(temp, transfer.target)
+            except BaseException:
+                os.replace(old, transfer.target)
+                raise
+            if transfer.replaces_dir:
+                shutil.rmtree(old)
+            else:
+                os.remove(old)
+        else:
+            os.replace(temp, transfer.target)
+    except BaseException:
+        if not os.path.lexists(temp):
+            raise
+        if os.path.lexists(transfer.source):
+            if is_real_dir(temp):
+                shutil.rmtree(temp)
+            else:
+                os.remove(temp)
+            raise
+        # A moved source only exists as temp now, it must not be lost
+        try:
+            shutil.move(temp, transfer.source)
+        except OSError as e:
+            raise OSError(f"{transfer.source} was left at {temp}: {e}") from e
+        raise
@@ -0,0 +1,120 @@
+import filecmp
+import hashlib
+import os
+import uuid
+from collections import defaultdict
+from app.components.executors.executor_pool import ExecutorPool
+
+BLOCK_SIZE = 64 * 1024
+
+
+def walk_files(root):
+    """Yield (path, stat) for every regular file below root"""
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from walk_files(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry.path, entry.stat(follow_symlinks=False)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+
+
+def partial_hash(path):
+    """Hash the first and last blocks of a file, None if it is unreadable"""
+    try:
+        with open(path, "rb") as f:
+            digest = hashlib.blake2b(f.read(BLOCK_SIZE))
+            size = os.fstat(f.fileno()).st_size
+            if size > 2 * BLOCK_SIZE:
+                f.seek(-BLOCK_SIZE, os.SEEK_END)
+            digest.update(f.read(BLOCK_SIZE))
+        return digest.hexdigest()
+    except OSError:
+        return None
+
+
+def _signature(st):
+    """What tells that a file was rewritten or replaced since it was seen"""
+    return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def link_duplicate(original, duplicate):
+    """
+    Replace duplicate with a hardlink to original.
+
+    The contents are compared again first, since either file may have
+    changed since the search, and the duplicate is only replaced if it is
+    still the file that was compared. Returns False when the files differ
+    or the duplicate changed, OSError propagates with nothing replaced.
+    """
+    before = _signature(os.stat(duplicate))
+    if before[:2] == _signature(os.stat(original))[:2]:
+        return True
+    if not filecmp.cmp(original, duplicate, shallow=False):
+        return False
+    directory, name = os.path.split(duplicate)
+    temp = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}.tmp")
+    os.link(original, temp)
+    try:
+        if _signature(os.stat(duplicate)) != before:
+            os.remove(temp)
+            return False
+        os.replace(temp, duplicate)
+    except OSError:
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+        raise
+    return True
+
+
+class DuplicateFinder:
+    def __init__(self, pool=None):
+        self.pool = pool or ExecutorPool.shared()
+
+    def find(self, root):
+        """Return the groups of identical files below root"""
+        by_size = defaultdict(dict)
+        for path, st in walk_files(root):
+            # Empty files are not worth reclaiming, and hardlinks to the
+            # same inode are already sharing their data
+            if st.st_size:
+                by_size[st.st_size].setdefault((st.st_dev, st.st_ino), path)
+        groups = [
+            (size, list(paths.values()))
+            for size, paths in by_size.items()
+            if len(paths) > 1
+        ]
+        if not groups:
+            return []
+        groups = self._refine(
+            groups, lambda paths: self.pool.map_cpu(partial_hash, paths)
+        )
+        # The partial hash already covered the whole of small files
+        small = [g for g in groups if g[0] <= 2 * BLOCK_SIZE]
+        large = [g for g in groups if g[0] > 2 * BLOCK_SIZE]
+        groups = small + self._refine(large, self.pool.hash_files)
+        return sorted(sorted(paths) for _, paths in groups)
+
+    @staticmethod
+    def _refine(groups, hash_paths):
+        """Split each group by the digest of its files"""
+        paths = [path for _, group in groups for path in group]
+        digests = iter(hash_paths(paths))
+        refined = []
+        for size, group in groups:
+            by_digest = defaultdict(list)
+            for path in group:
+                digest = next(digests)
+                if digest is not None:
+                    by_digest[digest].append(path)
+            refined.extend(
+                (size, same) for same in by_digest.values() if len(same) > 1
+            )
+        return refined
@@ -1,8 +1,12 @@
 import os
+from app.components.fileSystem.listing_store import ListingStore
 from app.components.fileSystem.interfaces.file_explorer_interface import (
     FileExplorerInterface,
 )
 
+# Number of entries printed before a tree view stops walking
+TREE_OUTPUT_LIMIT = 500
+
 
 class FileExplorer(FileExplorerInterface):
     def __init__(self, file_selector):
@@ -15,11 +19,15 @@ class FileExplorer(FileExplorerInterface):
             contents = self.file_selector.load_directory_contents(
                 self.current_path
                 )
+            shown = self.file_selector.visible_indices()
             print(f"\nCurrent Directory: {self.current_path}")
+            if self.file_selector.view is not None:
+                print(f"Filtered: {len(shown)} of {len(contents)} entries")
             print("-" * 50)
-            for index, element in enumerate(contents):
-                full_path = os.path.join(self.current_path, element)
-                if os.path.isdir(full_path):
+            for index, listing_index in enumerate(shown):
+                element = contents[listing_index]
+                # The entry type was read with the listing, no stat needed
+                if contents.is_dir(listing_index):
                     element_type = "📁 Folder"
                 else:
                     element_type = "📄 File"
@@ -29,11 +37,50 @@ class FileExplorer(FileExplorerInterface):
         except Exception as e:
             print(f"Error: {e}")
 
+    def walk_tree(self, path, max_depth, depth=1):
+        """Yield (depth, name, is_dir) below path, as soon as each is read"""
+        mtime_ns = os.stat(path).st_mtime_ns
+        listing = ListingStore(path)
+        with os.scandir(path) as entries:
+            for entry in entries:
+                listing.append_entry(entry)
+                is_dir = listing.is_dir(len(listing) - 1)
+                yield depth, entry.name, is_dir
+                if is_dir and depth < max_depth:
+                    try:
+                        yield from self.walk_tree(entry.path, max_depth, depth + 1)
+                    except PermissionError:
+                        yield depth + 1, "(access denied)", False
+                    except OSError as e:
+                        # E.g. removed since its parent was listed, the rest
+                        # of the tree is still worth showing
+                        yield depth + 1, f"({e.strerror or e})", False
+        # Only complete listings are kept, for a later navigation
+        self.file_selector.cache_listing(path, mtime_ns, listing)
+
+    def display_tree(self, max_depth, limit=TREE_OUTPUT_LIMIT):
+        """Display the tree below the current directory, up to max_depth"""
+        print(f"\n{self.current_path}")
+        walk = self.walk_tree(self.current_path, max_depth)
+        try:
+            for count, (depth, name, is_dir) in enumerate(walk):
+                if count == limit:
+                    print(f"... stopped after {limit} entries")
+                    break
+                element_type = "📁" if is_dir else "📄"
+                print(f"{'    ' * (depth - 1)}{element_type} {name}")
+        except PermissionError:
+            print("Access denied to this directory.")
+        except Exception as e:
+            print(f"Error: {e}")
+        finally:
+            walk.close()
+
     def navigate(self, index):
         """Navigate to a subdirectory"""
         try:
-            contents = os.listdir(self.current_path)
-            selected_element = contents[index]
+            self.file_selector.load_directory_contents(self.current_path)
+            selected_element = self.file_selector.visible_contents()[index]
             full_path = os.path.join(self.current_path, selected_element)
 
             if os.path.isdir(full_path):
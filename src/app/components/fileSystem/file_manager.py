@@ -1,42 +1,117 @@
-import os, shutil
-from app.components.fileSystem.file_selector import FileSelector
-from app.components.fileSystem.file_explorer import FileExplorer
+import os
+from functools import cached_property
 from app.components.fileSystem.interfaces.file_manager_interface import (
     FileManagerInterface,
 )
 
+# Operations import their modules when first used (shutil, tarfile, process
+# pools...), so that the menu shows up without paying for them
+
 
 class FileManager(FileManagerInterface):
     def __init__(self):
-        self.file_selector = FileSelector()
-        self.file_explorer = FileExplorer(self.file_selector)
+        self.duplicate_originals = {}
+
+    @cached_property
+    def file_selector(self):
+        from app.components.fileSystem.file_selector import FileSelector
+
+        return FileSelector()
+
+    @cached_property
+    def file_explorer(self):
+        from app.components.fileSystem.file_explorer import FileExplorer
+
+        return FileExplorer(self.file_selector)
 
-    def copy_files(self, destination):
+    def _plan(self, destination, policy):
+        """Plan the transfer of the selected files, reporting skipped ones"""
+        from app.components.fileSystem.conflict_policy import (
+            ConflictPolicy,
+            plan_transfers,
+        )
+
+        policy = policy or ConflictPolicy.OVERWRITE
+        selected_files = self.file_selector.get_selected_files()
+        transfers, skipped = plan_transfers(selected_files, destination, policy)
+        for file in skipped:
+            print(f"Skipped {os.path.basename(file)}: already in destination")
+        return transfers
+
+    def copy_files(self, destination, policy=None):
         """Copy selected files"""
+        import shutil
+        from app.components.fileSystem.conflict_policy import install
+        from app.components.fileSystem.sparse_copy import copy_sparse
+
+        def write(source, target):
+            if os.path.isdir(source):
+                shutil.copytree(source, target, symlinks=True)
+            elif os.path.isfile(source):
+                copy_sparse(source, target)
+            else:
+                shutil.copy2(source, target, follow_symlinks=False)
+
+        count = 0
         try:
-            selected_files = self.file_selector.get_selected_files()
-            for file in selected_files:
-                if os.path.exists(file):
-                    shutil.copy2(file, destination)
-            print(f"{len(selected_files)} file(s) copied")
+            for transfer in self._plan(destination, policy):
+                install(transfer, write)
+                count += 1
             self.file_selector.clear_selection()
         except Exception as e:
             print(f"Copy error: {e}")
+        print(f"{count} file(s) copied")
 
-    def move_files(self, destination):
+    def move_files(self, destination, policy=None):
         """Move selected files"""
+        import shutil
+        from app.components.fileSystem.conflict_policy import install
+
+        count = 0
         try:
-            selected_files = self.file_selector.get_selected_files()
-            for file in selected_files:
-                if os.path.exists(file):
-                    shutil.move(file, destination)
-            print(f"{len(selected_files)} file(s) moved")
+            for transfer in self._plan(destination, policy):
+                if os.path.lexists(transfer.source):
+                    install(transfer, shutil.move)
+                    count += 1
             self.file_selector.clear_selection()
         except Exception as e:
             print(f"Move error: {e}")
+        print(f"{count} file(s) moved")
+
+    def archive_files(self, destination, compression="", policy=None):
+        """Stream selected files as a tar into a directory or an archive file"""
+        from app.components.fileSystem.archiver import Archiver
+
+        try:
+            if os.path.isdir(destination):
+                count = Archiver().copy(self._plan(destination, policy), destination)
+            else:
+                selected_files = self.file_selector.get_selected_files()
+                with open(destination, "wb") as archive:
+                    count = Archiver().write(selected_files, archive, compression)
+            print(f"{count} file(s)/folder(s) archived")
+            self.file_selector.clear_selection()
+        except Exception as e:
+            print(f"Archive error: {e}")
+
+    def extract_archive(self, archive, destination):
+        """Restore an archive into the destination directory"""
+        from app.components.fileSystem.archiver import Archiver
+
+        try:
+            archiver = Archiver()
+            with open(archive, "rb") as source:
+                count = archiver.extract(source, destination)
+            for name, reason in archiver.rejected:
+                print(f"Skipped {name}: {reason}")
+            print(f"{count} file(s)/folder(s) extracted")
+        except Exception as e:
+            print(f"Extract error: {e}")
 
     def delete_files(self):
         """Delete selected files"""
+        import shutil
+
         try:
             selected_files = self.file_selector.get_selected_files()
             for file in selected_files:
@@ -48,3 +123,48 @@ class FileManager(FileManagerInterface):
             self.file_selector.clear_selection()
         except Exception as e:
             print(f"Delete error: {e}")
+
+    def find_duplicates(self):
+        """Find duplicates below the current directory and select them"""
+        from app.components.fileSystem.duplicate_finder import DuplicateFinder
+
+        try:
+            groups = DuplicateFinder().find(self.file_explorer.current_path)
+            self.duplicate_originals = {}
+            for original, *duplicates in groups:
+                print(f"\n{original}")
+                for duplicate in duplicates:
+                    print(f" = {duplicate}")
+                    self.duplicate_originals[duplicate] = original
+            print(f"\n{len(groups)} group(s) of duplicates found")
+            # Keeps the first file of each group, selects the others
+            self.file_selector.select_files(self.duplicate_originals)
+            return groups
+        except Exception as e:
+            print(f"Duplicate search error: {e}")
+            return []
+
+    def hardlink_duplicates(self):
+        """Replace the selected duplicates with hardlinks to their original"""
+        from app.components.fileSystem.duplicate_finder import link_duplicate
+
+        try:
+            count = 0
+            for file in self.file_selector.get_selected_files():
+                name = os.path.basename(file)
+                original = self.duplicate_originals.get(file)
+                if original is None:
+                    print(f"{name} is not a known duplicate")
+                    continue
+                try:
+                    if not link_duplicate(original, file):
+                        print(f"{name} changed since the search, kept")
+                        continue
+                except OSError as e:
+                    print(f"Hardlink error on {name}: {e}")
+                    continue
+                count += 1
+            print(f"{count} file(s) hardlinked")
+            self.file_selector.clear_selection()
+        except Exception as e:
+            print(f"Hardlink error: {e}")
@@ -1,22 +1,97 @@
 import os
+from collections import OrderedDict
+from app.components.fileSystem.listing_store import ListingStore, Selection
 from app.components.fileSystem.interfaces.file_selector_interface import (
     FileSelectorInterface,
 )
 
+# Listings kept from tree walks, the least recently stored go first
+LISTING_CACHE_SIZE = 64
+
 
 class FileSelector(FileSelectorInterface):
     def __init__(self):
-        self.selected_files = []
-        self.current_directory_contents = []
+        self.selected_files = Selection()
+        self.current_directory_contents = ListingStore()
+        self.current_directory = None
+        # Indices of the entries left visible by a filter, None when unfiltered
+        self.view = None
+        self._index = None
+        # Listings read by a tree walk: path -> (directory mtime, store)
+        self.listing_cache = OrderedDict()
+
+    def cache_listing(self, directory_path, mtime_ns, listing):
+        """Keep a listing read elsewhere for the next load of that directory"""
+        self.listing_cache[directory_path] = (mtime_ns, listing)
+        self.listing_cache.move_to_end(directory_path)
+        while len(self.listing_cache) > LISTING_CACHE_SIZE:
+            self.listing_cache.popitem(last=False)
+
+    def prefetch(self, directory_path):
+        """Read a listing ahead, for the next load of that directory"""
+        try:
+            mtime_ns = os.stat(directory_path).st_mtime_ns
+            listing = ListingStore.scan(directory_path)
+            self.cache_listing(directory_path, mtime_ns, listing)
+        except OSError:
+            # Left to the load, which reports it
+            pass
+
+    def _list_directory(self, directory_path):
+        """List a directory, reusing a cached listing if it is still valid"""
+        cached = self.listing_cache.pop(directory_path, None)
+        # Adding, removing or renaming an entry updates the directory mtime
+        if cached and cached[0] == os.stat(directory_path).st_mtime_ns:
+            return cached[1]
+        return ListingStore.scan(directory_path)
 
     def load_directory_contents(self, directory_path):
         """Load the contents of a directory"""
         try:
-            self.current_directory_contents = os.listdir(directory_path)
+            contents = self._list_directory(directory_path)
+            # An unchanged listing keeps its filter and search index
+            if (
+                directory_path != self.current_directory
+                or contents != self.current_directory_contents
+            ):
+                self.current_directory_contents = contents
+                self.view = None
+                self._index = None
+            self.current_directory = directory_path
             return self.current_directory_contents
         except Exception as e:
             print(f"Error loading directory contents: {e}")
-            return []
+            return ListingStore(directory_path)
+
+    def listing_index(self):
+        """Return the search index of the current listing, built on first use"""
+        if self._index is None:
+            from app.components.fileSystem.listing_index import ListingIndex
+
+            self._index = ListingIndex(self.current_directory_contents)
+        return self._index
+
+    def set_view(self, indices):
+        """Only show the given entries, or every entry when indices is None"""
+        self.view = None if indices is None else list(indices)
+
+    def visible_indices(self):
+        """Return the listing indices of the entries currently shown"""
+        if self.view is None:
+            return range(len(self.current_directory_contents))
+        return self.view
+
+    def visible_contents(self):
+        """Return the entries currently shown, filtered or not"""
+        if self.view is None:
+            return self.current_directory_contents
+        return [self.current_directory_contents[i] for i in self.view]
+
+    def _listing_index_of(self, index):
+        """Map an index of the shown entries to an index of the listing"""
+        if self.view is None:
+            return index
+        return self.view[index] if 0 <= index < len(self.view) else -1
 
     def select_files_by_indices(self, indices, directory_path):
         """Select files based on indices"""
@@ -24,16 +99,17 @@ class FileSelector(FileSelectorInterface):
             # Convert input string to list of indices
             selected_indices = [int(i.strip()) for i in indices.split(",")]
 
-            # Reset previous selection
-            self.selected_files.clear()
-
-            # Select files
-            for index in selected_indices:
-                if 0 <= index < len(self.current_directory_contents):
-                    full_path = os.path.join(
-                        directory_path, self.current_directory_contents[index]
-                    )
-                    self.selected_files.append(full_path)
+            # Select files, as indices into the listing of directory_path
+            contents = self.current_directory_contents
+            contents.directory = directory_path
+            self.selected_files = Selection(
+                contents,
+                [
+                    index
+                    for index in map(self._listing_index_of, selected_indices)
+                    if 0 <= index < len(contents)
+                ],
+            )
 
             print("Selected files:")
             for file in self.selected_files:
@@ -47,10 +123,16 @@ class FileSelector(FileSelectorInterface):
             print(f"Error selecting files: {e}")
             return []
 
+    def select_files(self, paths):
+        """Select files given by their full paths"""
+        self.selected_files = Selection.from_paths(paths)
+        print(f"{len(self.selected_files)} file(s) selected")
+        return self.selected_files
+
     def get_selected_files(self):
         """Return the list of currently selected files"""
-        return self.selected_files
+        return self.selected_files.paths()
 
     def clear_selection(self):
         """Clear the current file selection"""
-        self.selected_files.clear()
+        self.selected_files = Selection()
@@ -7,6 +7,10 @@ class FileExplorerInterface(ABC):
     def display_directory_contents(self):
         pass
 
+    @abstractmethod
+    def display_tree(self, max_depth):
+        pass
+
     @abstractmethod
     def navigate(self, index):
         pass
@@ -4,13 +4,29 @@ from abc import ABC, abstractmethod
 class FileManagerInterface(ABC):
 
     @abstractmethod
-    def copy_files(self, destination):
+    def copy_files(self, destination, policy):
         pass
 
     @abstractmethod
-    def move_files(self, destination):
+    def move_files(self, destination, policy):
+        pass
+
+    @abstractmethod
+    def archive_files(self, destination, compression, policy):
+        pass
+
+    @abstractmethod
+    def extract_archive(self, archive, destination):
         pass
 
     @abstractmethod
     def delete_files(self):
         pass
+
+    @abstractmethod
+    def find_duplicates(self):
+        pass
+
+    @abstractmethod
+    def hardlink_duplicates(self):
+        pass
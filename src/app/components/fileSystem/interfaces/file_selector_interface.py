@@ -11,6 +11,10 @@ class FileSelectorInterface(ABC):
     def select_files_by_indices(self, indices, directory_path):
         pass
 
+    @abstractmethod
+    def select_files(self, paths):
+        pass
+
     @abstractmethod
     def get_selected_files(self):
         pass
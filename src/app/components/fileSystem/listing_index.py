@@ -0,0 +1,116 @@
+import re
+from array import array
+from collections import defaultdict
+from functools import partial
+from itertools import compress, repeat
+from operator import contains
+
+# Prefix queries up to this length are answered by postings built upfront
+LEADING_LENGTH = 2
+
+
+class ListingIndex:
+    def __init__(self, names):
+        """
+        Search structures over a directory listing, built once per listing.
+
+        A single pass over the casefolded names records which names hold
+        each character and which names start with each of the first
+        characters. Queries of one character, the ones matching the most
+        names, are answered straight from these postings. Longer queries
+        only check the smallest candidate set, each check running in C
+        through compress and map rather than a Python loop.
+
+        :param names: Names of the listing, results are indices into it.
+        """
+        self.names = names
+        self.folded = [name.casefold() for name in names]
+        chars = defaultdict(partial(array, "I"))
+        leading = defaultdict(partial(array, "I"))
+        for index, name in enumerate(self.folded):
+            for char in set(name):
+                chars[char].append(index)
+            for length in range(1, min(len(name), LEADING_LENGTH) + 1):
+                leading[name[:length]].append(index)
+        # Plain dicts, so a lookup for an absent key does not add it
+        self._chars = dict(chars)
+        self._leading = dict(leading)
+
+    def search(self, query, mode, within=None):
+        """
+        Indices of the names matching query, in listing order.
+
+        :param mode: "prefix", "substring" or "fuzzy" (characters in order).
+        :param within: Matches of a shorter query, refined instead of
+            searching the whole listing.
+        """
+        query = query.casefold()
+        if not query:
+            return array("I", range(len(self.names)))
+        if mode == "prefix":
+            if len(query) <= LEADING_LENGTH:
+                return self._leading.get(query, array("I"))
+            candidates = [self._leading.get(query[:LEADING_LENGTH], array("I"))]
+        elif len(query) == 1:
+            return self.postings(query)
+        else:
+            candidates = [self.postings(char) for char in set(query)]
+        if within is not None:
+            candidates.append(within)
+        # Every candidate set holds all the matches, the smallest is checked
+        candidates = min(candidates, key=len)
+        folded = map(self.folded.__getitem__, candidates)
+        if mode == "prefix":
+            checks = map(str.startswith, folded, repeat(query))
+        elif mode == "fuzzy":
+            checks = map(self._fuzzy_regex(query).search, folded)
+        else:
+            checks = map(contains, folded, repeat(query))
+        return array("I", compress(candidates, checks))
+
+    def prefix(self, query, within=None):
+        """Indices of the names starting with query, in listing order"""
+        return self.search(query, "prefix", within)
+
+    def postings(self, char):
+        """Indices of the names containing char"""
+        return self._chars.get(char, array("I"))
+
+    @staticmethod
+    def _fuzzy_regex(query):
+        """Regex matching the characters of query in order"""
+        # Each gap excludes the character that ends it, so nothing backtracks
+        pattern = re.escape(query[0])
+        for char in query[1:]:
+            char = re.escape(char)
+            pattern += f"[^{char}]*{char}"
+        return re.compile(pattern)
+
+
+class IncrementalFilter:
+    def __init__(self, index, mode="substring"):
+        """Narrow a listing one character at a time, with instant undo"""
+        self.index = index
+        self.mode = mode
+        self._steps = [("", None)]
+
+    @property
+    def query(self):
+        return self._steps[-1][0]
+
+    @property
+    def matches(self):
+        """Indices matching the query, None while it is empty"""
+        return self._steps[-1][1]
+
+    def type(self, char):
+        """Add a character, refining the current matches"""
+        query = self.query + char
+        self._steps.append((query, self.index.search(query, self.mode, self.matches)))
+        return self.matches
+
+    def backspace(self):
+        """Remove the last character, restoring the previous matches"""
+        if len(self._steps) > 1:
+            self._steps.pop()
+        return self.matches
@@ -0,0 +1,50 @@
+import errno
+import os
+import shutil
+
+CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def data_extents(fd, size):
+    """Yield the (start, end) ranges of fd holding data, skipping holes"""
+    # Fully allocated files have no hole worth looking for
+    if not hasattr(os, "SEEK_DATA") or os.fstat(fd).st_blocks * 512 >= size:
+        if size:
+            yield 0, size
+        return
+    offset = 0
+    while offset < size:
+        try:
+            start = os.lseek(fd, offset, os.SEEK_DATA)
+        except OSError as e:
+            if e.errno == errno.ENXIO:  # Only a hole is left
+                return
+            if offset == 0:  # The filesystem cannot report holes
+                yield 0, size
+                return
+            raise
+        end = min(os.lseek(fd, start, os.SEEK_HOLE), size)
+        yield start, end
+        offset = end
+
+
+def copy_sparse(src, dest):
+    """Copy a file like shutil.copy2, but only its data, keeping holes"""
+    if os.path.isdir(dest):
+        dest = os.path.join(dest, os.path.basename(src))
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        for start, end in data_extents(fsrc.fileno(), size):
+            fsrc.seek(start)
+            fdst.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = fsrc.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                fdst.write(chunk)
+                remaining -= len(chunk)
+        # Recreates the trailing hole, if any
+        fdst.truncate(size)
+    shutil.copystat(src, dest)
+    return dest
@@ -0,0 +1,31 @@
+import sys
+
+ENTER = ("\r", "\n")
+BACKSPACE = ("\x7f", "\b")
+ESCAPE = ("\x1b", "\x03")
+
+
+def read_key():
+    """Read a single key press, without waiting for Enter"""
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+    if msvcrt is not None:
+        return msvcrt.getwch()
+
+    import termios
+    import tty
+
+    fd = sys.stdin.fileno()
+    previous = termios.tcgetattr(fd)
+    try:
+        tty.setcbreak(fd)
+        return sys.stdin.read(1)
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, previous)
+
+
+def interactive():
+    """Tell whether keys can be read one at a time"""
+    return sys.stdin.isatty()
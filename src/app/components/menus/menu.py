@@ -1,9 +1,15 @@
+import os
+import threading
+from functools import cached_property
 from app.components.fileSystem.file_manager import FileManager
+from app.components.menus import keyboard
+
+# Number of matches shown while typing a filter
+FILTER_PREVIEW = 20
 
 
 class Menu:
     def __init__(self):
-        self.file_manager = FileManager()
         self.commands = [
             "Display Directory",
             "Navigate",
@@ -12,9 +18,22 @@ class Menu:
             "Copy",
             "Move",
             "Delete",
+            "Find Duplicates",
+            "Hardlink Duplicates",
+            "Archive Copy",
+            "Extract Archive",
+            "Filter",
+            "Tree View",
             "Quit",
         ]
         self.choice = None
+        # Prompt waiting for an answer, shown again if output pushes it up
+        self.prompt = None
+        self.output_lock = threading.Lock()
+
+    @cached_property
+    def file_manager(self):
+        return FileManager()
 
     def display_commands(self):
         message = "\n--- File Explorer ---\n"
@@ -24,7 +43,11 @@ class Menu:
         print(message)
 
     def ask_choice(self, message_input) -> int:
-        choice = input(f"{message_input}")
+        with self.output_lock:
+            print(message_input, end="", flush=True)
+            self.prompt = message_input
+        choice = input()
+        self.prompt = None
         try:
             self.choice = int(choice)
             return self.choice
@@ -33,6 +56,65 @@ class Menu:
             self.choice = -1
             return self.ask_choice(message_input)
 
+    def ask_conflict_policy(self):
+        from app.components.fileSystem.conflict_policy import ConflictPolicy
+
+        names = "/".join(policy.value for policy in ConflictPolicy)
+        choice = input(f"On conflict ({names}) [overwrite]: ").strip().lower()
+        try:
+            return ConflictPolicy(choice or ConflictPolicy.OVERWRITE.value)
+        except ValueError:
+            print("Input not valid !")
+            return self.ask_conflict_policy()
+
+    def ask_filter_mode(self) -> str:
+        modes = ("prefix", "substring", "fuzzy")
+        choice = input("Filter mode (prefix/substring/fuzzy) [substring]: ")
+        choice = choice.strip().lower() or "substring"
+        if choice not in modes:
+            print("Input not valid !")
+            return self.ask_filter_mode()
+        return choice
+
+    def display_filter(self, live_filter):
+        names = self.file_manager.file_selector.current_directory_contents
+        matches = live_filter.matches
+        count = len(names) if matches is None else len(matches)
+        print("\033[H\033[JType to filter, Enter to keep, Esc to clear")
+        print(f"Filter: {live_filter.query}_  ({count} match(es))")
+        shown = range(min(count, FILTER_PREVIEW))
+        for position in shown:
+            index = position if matches is None else matches[position]
+            print(f"{position}. {names[index]}")
+        if count > FILTER_PREVIEW:
+            print("...")
+
+    def filter_listing(self):
+        from app.components.fileSystem.listing_index import IncrementalFilter
+
+        selector = self.file_manager.file_selector
+        selector.load_directory_contents(self.file_manager.file_explorer.current_path)
+        mode = self.ask_filter_mode()
+        live_filter = IncrementalFilter(selector.listing_index(), mode)
+        if not keyboard.interactive():
+            for char in input("Filter: "):
+                live_filter.type(char)
+            selector.set_view(live_filter.matches)
+            return
+        while True:
+            self.display_filter(live_filter)
+            key = keyboard.read_key()
+            if key in keyboard.ENTER:
+                selector.set_view(live_filter.matches)
+                return
+            if key in keyboard.ESCAPE:
+                selector.set_view(None)
+                return
+            if key in keyboard.BACKSPACE:
+                live_filter.backspace()
+            elif key.isprintable():
+                live_filter.type(key)
+
     def update(self):
         try:
             match self.choice:
@@ -59,12 +141,14 @@ class Menu:
 
                 case 4:
                     dest = input("Enter destination path for copying: ")
-                    self.file_manager.copy_files(dest)
+                    policy = self.ask_conflict_policy()
+                    self.file_manager.copy_files(dest, policy)
                     return True
 
                 case 5:
                     dest = input("Enter destination path for moving: ")
-                    self.file_manager.move_files(dest)
+                    policy = self.ask_conflict_policy()
+                    self.file_manager.move_files(dest, policy)
                     return True
 
                 case 6:
@@ -72,6 +156,41 @@ class Menu:
                     return True
 
                 case 7:
+                    self.file_manager.find_duplicates()
+                    return True
+
+                case 8:
+                    self.file_manager.hardlink_duplicates()
+                    return True
+
+                case 9:
+                    dest = input("Enter destination directory or archive file: ")
+                    compression = input("Compression (none/gz/bz2/xz) [none]: ")
+                    compression = compression.strip().lower()
+                    if compression == "none":
+                        compression = ""
+                    policy = None
+                    if os.path.isdir(dest):
+                        policy = self.ask_conflict_policy()
+                    self.file_manager.archive_files(dest, compression, policy)
+                    return True
+
+                case 10:
+                    archive = input("Enter archive path: ")
+                    dest = input("Enter destination path for extracting: ")
+                    self.file_manager.extract_archive(archive, dest)
+                    return True
+
+                case 11:
+                    self.filter_listing()
+                    return True
+
+                case 12:
+                    depth = self.ask_choice("Enter tree depth: ")
+                    self.file_manager.file_explorer.display_tree(max(depth, 1))
+                    return True
+
+                case 13:
                     print("Goodbye!")
                     return False
 
@@ -79,10 +198,25 @@ class Menu:
             print(f"An error occurred: {e}")
             return False
 
+    def display_first_listing(self):
+        """Print the first listing, then the prompt it may have pushed up"""
+        explorer = self.file_manager.file_explorer
+        # Read outside the lock, so the prompt is not held up meanwhile
+        self.file_manager.file_selector.prefetch(explorer.current_path)
+        with self.output_lock:
+            explorer.display_directory_contents()
+            if self.prompt is not None:
+                print(self.prompt, end="", flush=True)
+
     def engine(self):
+        # The menu shows up at once, the first listing is printed when read
+        self.display_commands()
+        first_listing = threading.Thread(target=self.display_first_listing, daemon=True)
+        first_listing.start()
         while True:
-            self.file_manager.file_explorer.display_directory_contents()
-            self.display_commands()
             self.ask_choice("Choice : ")
+            first_listing.join()
             if not self.update():
                 break
+            self.file_manager.file_explorer.display_directory_contents()
+            self.display_commands()
@@ -13,12 +13,14 @@
 """
 
 from app.components.menus.menu import Menu
+from app.components.executors.executor_pool import ExecutorPool
 
 
 def main():
     menu = Menu()
 
     menu.engine()
+    ExecutorPool.shared().shutdown()
 
 
 if __name__ == "__main__":
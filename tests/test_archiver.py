@@ -0,0 +1,186 @@
+import unittest, os, sys, io, shutil, tarfile, tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from app.components.executors.executor_pool import ExecutorPool  # noqa: E402
+from app.components.fileSystem.archiver import Archiver  # noqa: E402
+from app.components.fileSystem.conflict_policy import (  # noqa: E402
+    ConflictPolicy,
+    plan_transfers,
+)
+
+
+class Pipe(io.RawIOBase):
+    """Flux non positionnable, comme la sortie d'un tube."""
+
+    def __init__(self, data):
+        self.data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        return self.data.readinto(buffer)
+
+
+class TestArchiver(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ExecutorPool(processes=2, threads=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def setUp(self):
+        """Crée un dossier source avec un fichier et un sous-dossier."""
+        self.test_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.test_dir, "source")
+        self.destination = os.path.join(self.test_dir, "destination")
+        os.makedirs(os.path.join(self.source, "sub"))
+        os.makedirs(self.destination)
+        self.write(os.path.join(self.source, "a.txt"), b"a" * 10)
+        self.write(os.path.join(self.source, "sub", "b.bin"), os.urandom(3 << 20))
+        self.archiver = Archiver(self.pool)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write(self, path, data):
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def archive(self, compression=""):
+        output = io.BytesIO()
+        self.archiver.write([self.source], output, compression)
+        return output.getvalue()
+
+    def assertRestored(self):
+        restored = os.path.join(self.destination, "source")
+        for name in ("a.txt", os.path.join("sub", "b.bin")):
+            self.assertEqual(
+                self.read(os.path.join(restored, name)),
+                self.read(os.path.join(self.source, name)),
+            )
+
+    def test_gzip_extracted_from_stream(self):
+        """Vérifie qu'un gzip parallèle se relit depuis un tube."""
+        count = self.archiver.extract(Pipe(self.archive("gz")), self.destination)
+
+        self.assertEqual(count, 4)
+        self.assertRestored()
+
+    def test_gzip_extracted_from_file(self):
+        """Vérifie qu'un gzip parallèle se relit depuis un fichier."""
+        count = self.archiver.extract(io.BytesIO(self.archive("gz")), self.destination)
+
+        self.assertEqual(count, 4)
+        self.assertRestored()
+
+    def test_plain_tar_extracted_from_stream(self):
+        """Vérifie qu'un tar non compressé se relit depuis un tube."""
+        self.archiver.extract(Pipe(self.archive()), self.destination)
+
+        self.assertRestored()
+
+    def test_existing_symlink_replaced_not_followed(self):
+        """Vérifie qu'un lien existant est remplacé sans écrire à travers lui."""
+        outside = os.path.join(self.test_dir, "outside.txt")
+        self.write(outside, b"outside")
+        restored = os.path.join(self.destination, "source")
+        os.makedirs(restored)
+        os.symlink(outside, os.path.join(restored, "a.txt"))
+
+        self.archiver.extract(Pipe(self.archive()), self.destination)
+
+        self.assertEqual(self.read(outside), b"outside")
+        # Le filtre de tarfile, quand il existe, refuse ce chemin à la place
+        if not self.archiver.rejected:
+            self.assertFalse(os.path.islink(os.path.join(restored, "a.txt")))
+
+    def test_symlinked_directory_refused(self):
+        """Vérifie qu'un dossier lié hors de la destination est refusé."""
+        outside = os.path.join(self.test_dir, "outside")
+        os.makedirs(outside)
+        os.symlink(outside, os.path.join(self.destination, "source"))
+
+        count = self.archiver.extract(Pipe(self.archive()), self.destination)
+
+        self.assertEqual(count, 0)
+        self.assertEqual(len(self.archiver.rejected), 4)
+        self.assertEqual(os.listdir(outside), [])
+
+    def test_absolute_symlink_skipped_from_foreign_archive(self):
+        """Vérifie qu'un lien absolu d'une archive reçue est écarté seul."""
+        os.symlink("/etc", os.path.join(self.source, "abs"))
+        archive = self.archive()
+
+        count = self.archiver.extract(Pipe(archive), self.destination)
+
+        if hasattr(tarfile, "data_filter"):
+            self.assertEqual(count, 4)
+            self.assertEqual([n for n, _ in self.archiver.rejected], ["source/abs"])
+        self.assertRestored()
+
+    def test_copy_keeps_absolute_symlinks_and_modes(self):
+        """Vérifie que la copie par archive restaure liens absolus et droits."""
+        os.symlink("/etc", os.path.join(self.source, "abs"))
+        os.chmod(os.path.join(self.source, "a.txt"), 0o775)
+
+        count = self.copy(ConflictPolicy.OVERWRITE)
+
+        restored = os.path.join(self.destination, "source")
+        self.assertEqual(count, 5)
+        self.assertEqual(os.readlink(os.path.join(restored, "abs")), "/etc")
+        mode = os.stat(os.path.join(restored, "a.txt")).st_mode & 0o777
+        self.assertEqual(mode, 0o775)
+
+    def test_symlink_extracted_twice(self):
+        """Vérifie qu'un lien symbolique peut être restauré deux fois."""
+        os.symlink("a.txt", os.path.join(self.source, "link"))
+        archive = self.archive()
+
+        for _ in range(2):
+            self.archiver.extract(Pipe(archive), self.destination)
+
+        link = os.path.join(self.destination, "source", "link")
+        self.assertEqual(os.readlink(link), "a.txt")
+
+    def copy(self, policy):
+        transfers, _ = plan_transfers([self.source], self.destination, policy)
+        return self.archiver.copy(transfers, self.destination)
+
+    def test_copy_twice(self):
+        """Vérifie qu'une seconde copie remplace la première sans erreur."""
+        os.symlink("a.txt", os.path.join(self.source, "link"))
+
+        self.copy(ConflictPolicy.OVERWRITE)
+        count = self.copy(ConflictPolicy.OVERWRITE)
+
+        self.assertEqual(count, 5)
+        self.assertRestored()
+        self.assertEqual(os.listdir(self.destination), ["source"])
+
+    def test_copy_follows_policy(self):
+        """Vérifie que la copie par archive respecte la politique de conflit."""
+        existing = os.path.join(self.destination, "source")
+        os.makedirs(existing)
+        self.write(os.path.join(existing, "kept.txt"), b"kept")
+
+        self.copy(ConflictPolicy.SKIP)
+        self.assertEqual(os.listdir(existing), ["kept.txt"])
+
+        self.copy(ConflictPolicy.RENAME)
+        renamed = os.path.join(self.destination, "source (1)")
+        self.assertEqual(sorted(os.listdir(renamed)), ["a.txt", "sub"])
+        self.assertEqual(os.listdir(existing), ["kept.txt"])
+
+        self.copy(ConflictPolicy.OVERWRITE)
+        self.assertEqual(sorted(os.listdir(existing)), ["a.txt", "sub"])
+        self.assertEqual(
+            sorted(os.listdir(self.destination)), ["source", "source (1)"]
+        )
@@ -0,0 +1,202 @@
+import unittest, os, sys, shutil, tempfile, io, contextlib
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from app.components.fileSystem.conflict_policy import (  # noqa: E402
+    ConflictPolicy,
+    plan_transfers,
+)
+from app.components.fileSystem.file_manager import FileManager  # noqa: E402
+
+
+class ConflictTestCase(unittest.TestCase):
+    def setUp(self):
+        """Crée une source et une destination contenant déjà `a.txt`."""
+        self.test_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.test_dir, "source")
+        self.destination = os.path.join(self.test_dir, "destination")
+        os.makedirs(self.source)
+        os.makedirs(self.destination)
+        self.write(os.path.join(self.source, "a.txt"), "new")
+        self.write(os.path.join(self.source, "b.txt"), "b")
+        self.write(os.path.join(self.destination, "a.txt"), "old")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+
+class TestPlanTransfers(ConflictTestCase):
+    def plan(self, policy, names=("a.txt", "b.txt")):
+        files = [os.path.join(self.source, name) for name in names]
+        return plan_transfers(files, self.destination, policy)
+
+    def targets(self, transfers):
+        return [os.path.basename(transfer.target) for transfer in transfers]
+
+    def test_skip(self):
+        """Vérifie que SKIP écarte le fichier déjà présent."""
+        transfers, skipped = self.plan(ConflictPolicy.SKIP)
+
+        self.assertEqual(self.targets(transfers), ["b.txt"])
+        self.assertEqual(skipped, [os.path.join(self.source, "a.txt")])
+
+    def test_overwrite(self):
+        """Vérifie que OVERWRITE marque la cible comme remplacée."""
+        transfers, skipped = self.plan(ConflictPolicy.OVERWRITE)
+
+        self.assertEqual(skipped, [])
+        self.assertEqual([t.replaces for t in transfers], [True, False])
+        self.assertFalse(any(t.replaces_dir or t.is_dir for t in transfers))
+
+    def test_directory_types_recorded(self):
+        """Vérifie que les types scannés indiquent l'échange de dossiers."""
+        os.makedirs(os.path.join(self.destination, "b.txt"))
+        directory = os.path.join(self.test_dir, "a.txt")
+        os.makedirs(directory)
+        files = [os.path.join(self.source, "b.txt"), directory]
+
+        transfers, _ = plan_transfers(
+            files, self.destination, ConflictPolicy.OVERWRITE
+        )
+
+        self.assertEqual(
+            [(t.is_dir, t.replaces_dir) for t in transfers],
+            [(False, True), (True, False)],
+        )
+
+    def test_overwrite_if_newer(self):
+        """Vérifie que seule une source plus récente remplace la cible."""
+        os.utime(os.path.join(self.destination, "a.txt"), (2_000_000, 2_000_000))
+        os.utime(os.path.join(self.source, "a.txt"), (1_000_000, 1_000_000))
+
+        transfers, skipped = self.plan(ConflictPolicy.OVERWRITE_IF_NEWER)
+
+        self.assertEqual(self.targets(transfers), ["b.txt"])
+        self.assertEqual(len(skipped), 1)
+
+    def test_rename(self):
+        """Vérifie que RENAME choisit un nom libre, y compris dans la sélection."""
+        other = os.path.join(self.test_dir, "other")
+        os.makedirs(other)
+        self.write(os.path.join(other, "a.txt"), "other")
+        files = [os.path.join(self.source, "a.txt"), os.path.join(other, "a.txt")]
+
+        transfers, _ = plan_transfers(files, self.destination, ConflictPolicy.RENAME)
+
+        self.assertEqual(self.targets(transfers), ["a (1).txt", "a (2).txt"])
+        self.assertFalse(any(t.replaces for t in transfers))
+
+    def test_same_file_is_skipped(self):
+        """Vérifie qu'un fichier copié dans son propre dossier est écarté."""
+        for policy in ConflictPolicy:
+            transfers, skipped = plan_transfers(
+                [os.path.join(self.source, "a.txt")], self.source, policy
+            )
+            self.assertEqual(transfers, [])
+            self.assertEqual(len(skipped), 1)
+
+
+class TestFileManagerConflicts(ConflictTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manager = FileManager()
+
+    def run_quietly(self, method, *paths, destination=None):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.manager.file_selector.select_files(list(paths))
+            method(destination or self.destination)
+        return output.getvalue()
+
+    def test_copy_into_own_directory_keeps_source(self):
+        """Vérifie que copier un fichier dans son dossier ne le supprime pas."""
+        source = os.path.join(self.source, "a.txt")
+
+        output = self.run_quietly(
+            self.manager.copy_files, source, destination=self.source
+        )
+
+        self.assertEqual(self.read(source), "new")
+        self.assertIn("0 file(s) copied", output)
+
+    def test_move_into_own_directory_keeps_source(self):
+        """Vérifie que déplacer un fichier dans son dossier ne le supprime pas."""
+        source = os.path.join(self.source, "a.txt")
+
+        self.run_quietly(self.manager.move_files, source, destination=self.source)
+
+        self.assertEqual(self.read(source), "new")
+
+    def test_overwrite_file(self):
+        """Vérifie que le fichier existant est remplacé par le nouveau."""
+        output = self.run_quietly(
+            self.manager.copy_files, os.path.join(self.source, "a.txt")
+        )
+
+        self.assertEqual(self.read(os.path.join(self.destination, "a.txt")), "new")
+        self.assertEqual(os.listdir(self.destination), ["a.txt"])
+        self.assertIn("1 file(s) copied", output)
+
+    def test_overwrite_directory(self):
+        """Vérifie qu'un dossier remplace un dossier existant du même nom."""
+        existing = os.path.join(self.destination, "source")
+        os.makedirs(existing)
+        self.write(os.path.join(existing, "stale.txt"), "stale")
+
+        self.run_quietly(self.manager.copy_files, self.source)
+
+        self.assertEqual(sorted(os.listdir(existing)), ["a.txt", "b.txt"])
+        self.assertEqual(sorted(os.listdir(self.destination)), ["a.txt", "source"])
+
+    def test_failed_copy_keeps_destination(self):
+        """Vérifie qu'une copie échouée laisse la destination intacte."""
+        with patch(
+            "app.components.fileSystem.sparse_copy.copy_sparse",
+            side_effect=OSError("disk full"),
+        ):
+            output = self.run_quietly(
+                self.manager.copy_files, os.path.join(self.source, "a.txt")
+            )
+
+        self.assertIn("disk full", output)
+        self.assertEqual(self.read(os.path.join(self.destination, "a.txt")), "old")
+        self.assertEqual(os.listdir(self.destination), ["a.txt"])
+
+    def test_failed_move_keeps_source(self):
+        """Vérifie qu'un déplacement échoué remet la source à sa place."""
+        with patch("os.replace", side_effect=OSError("busy")):
+            output = self.run_quietly(
+                self.manager.move_files, os.path.join(self.source, "b.txt")
+            )
+
+        self.assertIn("busy", output)
+        self.assertEqual(self.read(os.path.join(self.source, "b.txt")), "b")
+        self.assertEqual(os.listdir(self.destination), ["a.txt"])
+
+    def test_failed_directory_swap_keeps_destination(self):
+        """Vérifie qu'un échec pendant l'échange de dossiers restaure la cible."""
+        existing = os.path.join(self.destination, "source")
+        os.makedirs(existing)
+        self.write(os.path.join(existing, "stale.txt"), "stale")
+        replace = os.replace
+
+        def fail_install(source, target):
+            if target == existing and source.endswith(".tmp"):
+                raise OSError("busy")
+            replace(source, target)
+
+        with patch("os.replace", side_effect=fail_install):
+            output = self.run_quietly(self.manager.copy_files, self.source)
+
+        self.assertIn("busy", output)
+        self.assertEqual(os.listdir(existing), ["stale.txt"])
+        self.assertEqual(sorted(os.listdir(self.destination)), ["a.txt", "source"])
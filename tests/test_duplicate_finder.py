@@ -0,0 +1,154 @@
+import unittest, os, sys, errno, shutil, tempfile, io, contextlib
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from app.components.executors.executor_pool import ExecutorPool  # noqa: E402
+from app.components.fileSystem.duplicate_finder import (  # noqa: E402
+    BLOCK_SIZE,
+    DuplicateFinder,
+    partial_hash,
+)
+from app.components.fileSystem.file_manager import FileManager  # noqa: E402
+
+
+class DuplicateTestCase(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write(self, name, data):
+        path = os.path.join(self.test_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+
+class TestDuplicateFinder(DuplicateTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ExecutorPool(processes=2, threads=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def find(self):
+        return DuplicateFinder(self.pool).find(self.test_dir)
+
+    def test_groups_identical_files(self):
+        """Vérifie que seuls les fichiers identiques sont regroupés."""
+        a = self.write("a", b"same")
+        b = self.write("b", b"same")
+        self.write("c", b"diff")
+        self.write("d", b"longer")
+        self.write("empty1", b"")
+        self.write("empty2", b"")
+
+        self.assertEqual(self.find(), [[a, b]])
+
+    def test_large_files_split_by_full_hash(self):
+        """Vérifie que des fichiers ne différant qu'au milieu sont séparés."""
+        head, tail = b"h" * BLOCK_SIZE, b"t" * BLOCK_SIZE
+        a = self.write("a", head + b"x" * BLOCK_SIZE + tail)
+        b = self.write("b", head + b"x" * BLOCK_SIZE + tail)
+        c = self.write("c", head + b"y" * BLOCK_SIZE + tail)
+
+        self.assertEqual(partial_hash(a), partial_hash(c))
+        self.assertEqual(self.find(), [[a, b]])
+
+    def test_hardlinks_counted_once(self):
+        """Vérifie que des liens vers un même inode ne sont pas des doublons."""
+        a = self.write("a", b"data")
+        os.link(a, os.path.join(self.test_dir, "a-link"))
+
+        self.assertEqual(self.find(), [])
+
+        self.write("b", b"data")
+        groups = self.find()
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(len(groups[0]), 2)
+
+    def test_unreadable_file_left_out(self):
+        """Vérifie qu'un fichier illisible n'est rangé dans aucun groupe."""
+        self.assertIsNone(partial_hash(os.path.join(self.test_dir, "missing")))
+        refined = DuplicateFinder._refine(
+            [(4, ["a", "b", "c"])], lambda paths: ["x", None, "x"]
+        )
+        self.assertEqual(refined, [(4, ["a", "c"])])
+
+    @unittest.skipIf(os.geteuid() == 0, "root lit tous les fichiers")
+    def test_unreadable_file_on_disk(self):
+        """Vérifie qu'un fichier sans droit de lecture est ignoré."""
+        a = self.write("a", b"data")
+        b = self.write("b", b"data")
+        locked = self.write("c", b"data")
+        os.chmod(locked, 0)
+
+        self.assertEqual(self.find(), [[a, b]])
+
+
+class TestHardlinkDuplicates(DuplicateTestCase):
+    def setUp(self):
+        super().setUp()
+        self.original = self.write("original", b"data")
+        self.copies = [self.write(name, b"data") for name in ("copy1", "copy2")]
+        self.manager = FileManager()
+        self.manager.duplicate_originals = {
+            copy: self.original for copy in self.copies
+        }
+
+    def hardlink(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.manager.file_selector.select_files(self.copies)
+            self.manager.hardlink_duplicates()
+        return output.getvalue()
+
+    def linked(self, path):
+        return os.path.samefile(path, self.original)
+
+    def test_hardlinks_duplicates(self):
+        """Vérifie que chaque doublon devient un lien vers l'original."""
+        output = self.hardlink()
+
+        self.assertIn("2 file(s) hardlinked", output)
+        self.assertTrue(all(map(self.linked, self.copies)))
+        self.assertEqual(len(os.listdir(self.test_dir)), 3)
+
+    def test_changed_duplicate_kept(self):
+        """Vérifie qu'un doublon modifié depuis la recherche est conservé."""
+        self.write("copy1", b"edit")
+
+        output = self.hardlink()
+
+        self.assertIn("1 file(s) hardlinked", output)
+        self.assertFalse(self.linked(self.copies[0]))
+        self.assertTrue(self.linked(self.copies[1]))
+        with open(self.copies[0], "rb") as f:
+            self.assertEqual(f.read(), b"edit")
+
+    def test_link_error_reported_per_file(self):
+        """Vérifie qu'un échec de lien n'arrête pas les fichiers suivants."""
+        link = os.link
+        error = OSError(errno.EXDEV, "Invalid cross-device link")
+
+        def fail_first(source, target):
+            if "copy1" in target:
+                raise error
+            link(source, target)
+
+        with patch("os.link", side_effect=fail_first):
+            output = self.hardlink()
+
+        self.assertIn("copy1", output)
+        self.assertIn("1 file(s) hardlinked", output)
+        self.assertFalse(self.linked(self.copies[0]))
+        self.assertTrue(self.linked(self.copies[1]))
+        self.assertEqual(len(os.listdir(self.test_dir)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest, errno, os, shutil, tempfile
+from unittest.mock import patch
+from correction import durable
+from correction.durable import Durability, DurableWriter
+
+
+class TestDurableWriter(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.writer = DurableWriter(batch_files=3)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def stage(self, name, data=b"content"):
+        """Écrit un fichier sous un nom temporaire à côté de sa cible."""
+        target = os.path.join(self.test_dir, name)
+        temp = self.writer.temp_for(target)
+        with open(temp, "wb") as f:
+            f.write(data)
+        return temp, target
+
+    def test_batch_published_on_flush(self):
+        """Vérifie qu'un lot n'apparaît sous son nom final qu'au flush."""
+        temp, target = self.stage("file.txt")
+        self.writer.add(temp, target, Durability.BATCH)
+
+        self.assertFalse(os.path.exists(target))
+        self.assertEqual(self.writer.flush(), [])
+        with open(target, "rb") as f:
+            self.assertEqual(f.read(), b"content")
+        self.assertEqual(os.listdir(self.test_dir), ["file.txt"])
+
+    def test_batch_committed_when_full(self):
+        """Vérifie qu'un lot plein est validé sans attendre le flush."""
+        for name in ("a", "b", "c"):
+            self.writer.add(*self.stage(name), Durability.BATCH)
+
+        self.assertEqual(sorted(os.listdir(self.test_dir)), ["a", "b", "c"])
+        self.assertEqual(self.writer.pending, [])
+
+    def test_batch_syncs_directory_once(self):
+        """Vérifie que le dossier parent n'est synchronisé qu'une fois par lot."""
+        with patch.object(durable, "fsync_directory") as fsync_directory:
+            for name in ("a", "b"):
+                self.writer.add(*self.stage(name), Durability.BATCH)
+            self.writer.flush()
+
+        fsync_directory.assert_called_once_with(os.path.abspath(self.test_dir))
+
+    def test_full_published_at_once(self):
+        """Vérifie qu'en mode complet le fichier est publié immédiatement."""
+        temp, target = self.stage("file.txt")
+
+        with patch.object(durable, "fsync_path") as fsync_path:
+            self.writer.add(temp, target, Durability.FULL)
+
+        fsync_path.assert_called_once_with(temp)
+        self.assertTrue(os.path.exists(target))
+        self.assertFalse(os.path.exists(temp))
+
+    def test_replaces_existing_file(self):
+        """Vérifie que l'ancien fichier est remplacé en entier."""
+        temp, target = self.stage("file.txt", b"new")
+        with open(target, "wb") as f:
+            f.write(b"old content")
+
+        self.writer.add(temp, target, Durability.BATCH)
+        self.writer.flush()
+
+        with open(target, "rb") as f:
+            self.assertEqual(f.read(), b"new")
+
+    def test_callback_after_commit(self):
+        """Vérifie que la source d'un déplacement n'est supprimée qu'après."""
+        source = os.path.join(self.test_dir, "source")
+        open(source, "w").close()
+        temp, target = self.stage("target")
+
+        self.writer.add(
+            temp, target, Durability.BATCH, then=lambda: os.remove(source)
+        )
+        self.assertTrue(os.path.exists(source))
+        self.writer.flush()
+
+        self.assertFalse(os.path.exists(source))
+        self.assertTrue(os.path.exists(target))
+
+    def test_failures_reported_by_flush(self):
+        """Vérifie qu'un renommage impossible est signalé et nettoyé."""
+        temp, target = self.stage("file.txt")
+        os.makedirs(os.path.join(target, "child"))
+
+        self.writer.add(temp, target, Durability.BATCH)
+        failures = self.writer.flush()
+
+        self.assertEqual([path for path, _ in failures], [target])
+        self.assertFalse(os.path.exists(temp))
+        self.assertEqual(self.writer.flush(), [])
+
+    def test_failed_sync_drops_whole_batch(self):
+        """Vérifie qu'un lot non synchronisé est signalé en entier et nettoyé."""
+        targets = []
+        for name in ("a", "b"):
+            temp, target = self.stage(name)
+            self.writer.add(temp, target, Durability.BATCH)
+            targets.append(os.path.abspath(target))
+
+        error = OSError(errno.EIO, "Input/output error")
+        with patch.object(durable, "fsync_path", side_effect=error):
+            failures = self.writer.flush()
+
+        self.assertEqual([path for path, _ in failures], targets)
+        self.assertEqual(os.listdir(self.test_dir), [])
+        self.assertEqual(self.writer.pending, [])
+
+    def test_failed_full_sync_removes_temp(self):
+        """Vérifie qu'un fichier non synchronisé en mode complet est nettoyé."""
+        temp, target = self.stage("file.txt")
+
+        error = OSError(errno.EIO, "Input/output error")
+        with patch.object(durable, "fsync_path", side_effect=error):
+            with self.assertRaises(OSError):
+                self.writer.add(temp, target, Durability.FULL)
+
+        self.assertEqual(os.listdir(self.test_dir), [])
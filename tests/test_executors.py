@@ -0,0 +1,163 @@
+import unittest, os, sys, io, gzip, hashlib, multiprocessing, shutil, tempfile
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from app.components.executors.executor_pool import (  # noqa: E402
+    ExecutorPool,
+    chunk_ranges,
+    hash_range,
+)
+from app.components.executors.parallel_gzip import (  # noqa: E402
+    GzipStreamReader,
+    ParallelGzipWriter,
+)
+
+
+class Pipe(io.RawIOBase):
+    """Flux non positionnable qui rend les données par petits morceaux."""
+
+    def __init__(self, data, size=7):
+        self.data = io.BytesIO(data)
+        self.size = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        chunk = self.data.read(min(len(buffer), self.size))
+        buffer[: len(chunk)] = chunk
+        return len(chunk)
+
+
+class TestExecutorPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ExecutorPool(processes=2, threads=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write(self, name, data):
+        path = os.path.join(self.test_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_chunk_ranges(self):
+        """Vérifie le découpage d'une taille en morceaux contigus."""
+        self.assertEqual(chunk_ranges(10, 4), [(0, 4), (4, 4), (8, 2)])
+        self.assertEqual(chunk_ranges(0, 4), [])
+
+    def test_hash_range(self):
+        """Vérifie que le hachage d'une plage ne porte que sur elle."""
+        path = self.write("file", b"abcdef")
+
+        self.assertEqual(hash_range(path, 0, 3), hashlib.blake2b(b"abc").digest())
+        self.assertEqual(hash_range(path, 0, 0), hashlib.blake2b().digest())
+
+    def test_hash_files(self):
+        """Vérifie que le découpage en morceaux ne change que la taille du travail."""
+        chunk = 64 * 1024
+        same = [self.write(name, b"x" * (3 * chunk + 5)) for name in ("a", "b")]
+        other = self.write("c", b"x" * (3 * chunk) + b"y" * 5)
+        empty = self.write("empty", b"")
+        missing = os.path.join(self.test_dir, "missing")
+
+        digests = self.pool.hash_files([*same, other, empty, missing], chunk)
+
+        self.assertEqual(digests[0], digests[1])
+        self.assertNotEqual(digests[0], digests[2])
+        self.assertIsNotNone(digests[3])
+        self.assertIsNone(digests[4])
+
+    def test_file_shrunk_while_hashing(self):
+        """Vérifie qu'un fichier raccourci entre-temps est ignoré."""
+        path = self.write("file", b"abc")
+
+        with self.assertRaises(ValueError):
+            hash_range(path, 0, 10)
+        future = Future()
+        future.set_exception(ValueError("mmap length is greater than file size"))
+        self.assertIsNone(self.pool._combine(10, [future]))
+
+    def test_broken_pool_restarted(self):
+        """Vérifie qu'un pool de processus cassé est remplacé."""
+        pool = ExecutorPool(processes=1)
+        broken = MagicMock()
+        pool._cpu = broken
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+
+        self.assertIsNone(pool._combine(3, [future]))
+        broken.shutdown.assert_called_once()
+        self.assertIsNone(pool._cpu)
+
+    def test_map_cpu(self):
+        """Vérifie que les résultats restent dans l'ordre des éléments."""
+        self.assertEqual(list(self.pool.map_cpu(abs, range(-5, 5))), [
+            5, 4, 3, 2, 1, 0, 1, 2, 3, 4,
+        ])
+
+    @unittest.skipUnless(
+        "forkserver" in multiprocessing.get_all_start_methods(),
+        "forkserver indisponible sur cette plateforme",
+    )
+    def test_workers_not_forked_from_caller(self):
+        """Vérifie que les processus ne sont pas des forks du programme."""
+        self.assertNotEqual(self.pool.cpu.submit(os.getppid).result(), os.getpid())
+
+    def test_shared(self):
+        """Vérifie que le pool partagé est unique."""
+        self.assertIs(ExecutorPool.shared(), ExecutorPool.shared())
+
+
+class TestParallelGzip(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ExecutorPool(processes=2, threads=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def compress(self, data):
+        output = io.BytesIO()
+        writer = ParallelGzipWriter(output, self.pool, block_size=1000, in_flight=2)
+        for start in range(0, len(data), 700):
+            writer.write(data[start : start + 700])
+        writer.close()
+        return output.getvalue()
+
+    def test_writes_gzip_members(self):
+        """Vérifie que les blocs forment un gzip valide de plusieurs membres."""
+        data = os.urandom(2500) + b"a" * 2500
+
+        compressed = self.compress(data)
+
+        self.assertEqual(gzip.decompress(compressed), data)
+        self.assertEqual(compressed.count(b"\x1f\x8b\x08"), 5)
+
+    def test_stream_reader_reads_every_member(self):
+        """Vérifie que la lecture en flux ne s'arrête pas au premier membre."""
+        data = bytes(range(256)) * 20
+        reader = io.BufferedReader(GzipStreamReader(Pipe(self.compress(data))))
+
+        self.assertEqual(reader.read(), data)
+
+    def test_stream_reader_truncated(self):
+        """Vérifie qu'un flux tronqué est signalé."""
+        compressed = self.compress(b"z" * 3000)
+        reader = GzipStreamReader(Pipe(compressed[:-3]))
+
+        with self.assertRaises(EOFError):
+            reader.read()
@@ -0,0 +1,117 @@
+import unittest, os, shutil, tempfile, hashlib
+from unittest.mock import patch
+from correction.fcopy import StreamCopier
+
+
+class TestStreamCopier(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.test_dir, "source.bin")
+        self.data = os.urandom(300 * 1024 + 17)
+        with open(self.source, "wb") as f:
+            f.write(self.data)
+        os.utime(self.source, (1_000_000, 1_000_000))
+        self.destination_dir = os.path.join(self.test_dir, "destination")
+        os.makedirs(self.destination_dir)
+        # Petits tampons pour traverser plusieurs lots d'écriture
+        self.copier = StreamCopier(buffer_size=16 * 1024, flush_batch=64 * 1024)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_kernel_copy_returning_zero(self):
+        """Vérifie le repli sur la copie tamponnée quand le noyau copie 0 octet."""
+        copier = StreamCopier(buffer_size=16 * 1024, drop_cache=False)
+        copier._kernel_copy = True
+
+        with patch("os.copy_file_range", create=True, return_value=0):
+            dest = copier.copy(self.source, self.destination_dir)
+
+        self.assertEqual(self.read(dest), self.data)
+
+    def test_progress_before_each_chunk(self):
+        """Vérifie que la progression annonce des blocs bornés avant écriture."""
+        chunks = []
+        self.copier.copy(
+            self.source,
+            self.destination_dir,
+            progress=lambda size: chunks.append(size),
+        )
+
+        self.assertEqual(sum(chunks), len(self.data))
+        self.assertLessEqual(max(chunks), 16 * 1024)
+
+    def test_copy_into_directory(self):
+        """Vérifie que la copie vers un dossier garde le nom et le contenu."""
+        dest = self.copier.copy(self.source, self.destination_dir)
+
+        self.assertEqual(dest, os.path.join(self.destination_dir, "source.bin"))
+        self.assertEqual(self.read(dest), self.data)
+
+    def test_copy_preserves_metadata(self):
+        """Vérifie que la date de modification est conservée comme copy2."""
+        dest = self.copier.copy(self.source, os.path.join(self.test_dir, "c.bin"))
+
+        self.assertEqual(os.stat(dest).st_mtime, 1_000_000)
+
+    def test_buffer_is_reused(self):
+        """Vérifie que plusieurs copies réutilisent le même tampon."""
+        buffer = self.copier.buffer
+
+        self.copier.copy(self.source, os.path.join(self.test_dir, "a.bin"))
+        self.copier.copy(self.source, os.path.join(self.test_dir, "b.bin"))
+
+        self.assertIs(self.copier.buffer, buffer)
+        self.assertEqual(self.read(os.path.join(self.test_dir, "b.bin")), self.data)
+
+    def test_copy_keeps_holes(self):
+        """
+        Vérifie qu'un fichier creux reste creux après la copie :
+        - le contenu est identique, trous compris ;
+        - la destination n'occupe pas plus de blocs que la source.
+        """
+        sparse = os.path.join(self.test_dir, "disk.img")
+        with open(sparse, "wb") as f:
+            f.truncate(8 * 1024 * 1024)
+            f.seek(3 * 1024 * 1024)
+            f.write(b"data" * 1024)
+
+        for copier in (self.copier, StreamCopier(drop_cache=False)):
+            dest = copier.copy(sparse, os.path.join(self.test_dir, "copy.img"))
+
+            self.assertEqual(self.read(dest), self.read(sparse))
+            self.assertLessEqual(os.stat(dest).st_blocks, os.stat(sparse).st_blocks)
+
+    def test_digest_while_copying(self):
+        """
+        Vérifie le mode de vérification :
+        - l'empreinte calculée pendant la copie est celle de la source ;
+        - la relecture de la destination donne la même empreinte, trous compris.
+        """
+        with open(self.source, "r+b") as f:
+            f.truncate(4 * 1024 * 1024)
+        for copier in (self.copier, StreamCopier(drop_cache=False)):
+            digest = hashlib.blake2b()
+
+            dest = copier.copy(self.source, self.destination_dir, digest)
+
+            expected = hashlib.blake2b(self.read(self.source)).hexdigest()
+            self.assertEqual(digest.hexdigest(), expected)
+            self.assertEqual(copier.digest(dest), expected)
+
+    def test_copy_empty_file(self):
+        """Vérifie la copie d'un fichier vide."""
+        empty = os.path.join(self.test_dir, "empty")
+        open(empty, "wb").close()
+
+        dest = self.copier.copy(empty, self.destination_dir)
+
+        self.assertEqual(self.read(dest), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest, os, sys, io, shutil, tempfile, contextlib
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from app.components.fileSystem import file_selector  # noqa: E402
+from app.components.fileSystem.file_explorer import FileExplorer  # noqa: E402
+from app.components.fileSystem.file_selector import FileSelector  # noqa: E402
+
+
+class TestWalkTree(unittest.TestCase):
+    def setUp(self):
+        """Crée deux dossiers, dont un avec un sous-dossier."""
+        self.test_dir = tempfile.mkdtemp()
+        for folder in ("a/deep", "b"):
+            os.makedirs(os.path.join(self.test_dir, folder))
+        for name in ("a/deep/x.txt", "b/y.txt"):
+            open(os.path.join(self.test_dir, name), "w").close()
+        self.selector = FileSelector()
+        self.explorer = FileExplorer(self.selector)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def walk(self, max_depth):
+        return sorted(self.explorer.walk_tree(self.test_dir, max_depth))
+
+    def test_walk_depth_limited(self):
+        """Vérifie que la profondeur maximale est respectée."""
+        self.assertEqual(self.walk(1), [(1, "a", True), (1, "b", True)])
+        self.assertIn((3, "x.txt", False), self.walk(3))
+        self.assertNotIn((3, "x.txt", False), self.walk(2))
+
+    def test_vanished_directory_skipped(self):
+        """Vérifie qu'un dossier disparu n'interrompt pas le reste de l'arbre."""
+        scandir = os.scandir
+        vanished = os.path.join(self.test_dir, "a")
+
+        def racy_scandir(path):
+            if path == vanished:
+                raise FileNotFoundError(2, "No such file or directory", path)
+            return scandir(path)
+
+        with patch("os.scandir", racy_scandir):
+            entries = self.walk(2)
+
+        self.assertIn((2, "(No such file or directory)", False), entries)
+        self.assertIn((2, "y.txt", False), entries)
+
+    def test_access_denied_skipped(self):
+        """Vérifie qu'un dossier interdit est signalé sans arrêter la visite."""
+        scandir = os.scandir
+        denied = os.path.join(self.test_dir, "b")
+
+        def denying_scandir(path):
+            if path == denied:
+                raise PermissionError(13, "Permission denied", path)
+            return scandir(path)
+
+        with patch("os.scandir", denying_scandir):
+            entries = self.walk(3)
+
+        self.assertIn((2, "(access denied)", False), entries)
+        self.assertIn((3, "x.txt", False), entries)
+
+    def test_walked_listing_reused(self):
+        """Vérifie qu'une liste lue par la visite sert au chargement suivant."""
+        self.walk(2)
+        folder = os.path.join(self.test_dir, "b")
+
+        with patch.object(file_selector.ListingStore, "scan") as scan:
+            contents = self.selector.load_directory_contents(folder)
+
+        scan.assert_not_called()
+        self.assertEqual(list(contents), ["y.txt"])
+
+    def test_listing_cache_bounded(self):
+        """Vérifie que le cache ne garde que les listes les plus récentes."""
+        with patch.object(file_selector, "LISTING_CACHE_SIZE", 2):
+            self.walk(3)
+
+        self.assertEqual(len(self.selector.listing_cache), 2)
+        self.assertIn(self.test_dir, self.selector.listing_cache)
+
+    def test_display_tree(self):
+        """Vérifie l'affichage indenté de l'arbre."""
+        self.explorer.current_path = self.test_dir
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout(output):
+            self.explorer.display_tree(3)
+
+        self.assertIn("        📄 x.txt", output.getvalue())
@@ -1,7 +1,7 @@
-import unittest, os, shutil
+import unittest, os, shutil, io, contextlib
 from unittest.mock import MagicMock, patch, call
 from correction.futils import FileManager, FileSelection, FileSystem
-from correction.ui import UserInterface
+from correction.ui import ConsoleUI, UserInterface
 
 
 class TestFileManager(unittest.TestCase):
@@ -291,6 +291,92 @@ class TestFileManager(unittest.TestCase):
         # Vérifie que la méthode copy n'a pas été appelée
         self.file_system.copy.assert_not_called()
 
+    def test_copy_files_verify(self):
+        """
+        Teste le mode de copie avec vérification.
+        - Simule une empreinte différente pour le second fichier.
+        - Vérifie que seul le fichier vérifié est compté.
+        - Vérifie que l'écart est signalé via l'interface utilisateur.
+        """
+        self.file_selection.get_and_reset.return_value = ["file1.txt", "file2.txt"]
+        self.file_system.copy.side_effect = [
+            None,
+            ValueError("file2.txt: checksum mismatch"),
+        ]
+
+        count = self.file_manager.copy_files(self.destination_dir, verify=True)
+
+        self.assertEqual(count, 1)
+        self.file_system.copy.assert_has_calls(
+            [
+                call("file1.txt", self.destination_dir, verify=True),
+                call("file2.txt", self.destination_dir, verify=True),
+            ]
+        )
+        self.ui.error.assert_called_once_with("Copy: file2.txt: checksum mismatch")
+
+    def test_copy_files_durable(self):
+        """
+        Teste la copie durable.
+        - Vérifie que la durabilité est transmise à `copy`.
+        - Vérifie qu'un fichier non publié par `flush` n'est pas compté.
+        """
+        self.file_selection.get_and_reset.return_value = ["file1.txt", "file2.txt"]
+        self.file_system.flush.return_value = [
+            ("file2.txt", OSError("No space left on device"))
+        ]
+
+        count = self.file_manager.copy_files(self.destination_dir, durability="batch")
+
+        self.assertEqual(count, 1)
+        self.file_system.copy.assert_has_calls(
+            [
+                call("file1.txt", self.destination_dir, durability="batch"),
+                call("file2.txt", self.destination_dir, durability="batch"),
+            ]
+        )
+        self.file_system.flush.assert_called_once()
+        self.ui.error.assert_called_once_with("Copy: No space left on device")
+
+    def test_copy_files_flush_error(self):
+        """
+        Teste le cas où `flush` lui-même échoue.
+        - Vérifie que l'erreur est signalée au lieu d'interrompre la copie.
+        - Vérifie qu'aucun fichier n'est compté, rien n'étant publié.
+        """
+        self.file_selection.get_and_reset.return_value = ["file1.txt"]
+        self.file_system.flush.side_effect = OSError("Input/output error")
+
+        count = self.file_manager.copy_files(self.destination_dir)
+
+        self.assertEqual(count, 0)
+        self.ui.error.assert_called_once_with("Copy: Input/output error")
+
+    def test_flush_default(self):
+        """
+        Teste le `flush` par défaut d'un backend qui ne le redéfinit pas.
+        - Vérifie qu'il ne signale aucun échec.
+        """
+        self.assertEqual(FileSystem().flush(), [])
+
+    def test_snapshot_files_success(self):
+        """
+        Teste le cas où les fichiers sélectionnés sont capturés dans un snapshot.
+        - Vérifie que `snapshot` reçoit la destination et le snapshot précédent.
+        """
+        self.file_selection.get_and_reset.return_value = ["file1.txt", "folder1/"]
+
+        count = self.file_manager.snapshot_files(self.destination_dir, "/previous")
+
+        self.assertEqual(count, 2)
+        self.file_system.snapshot.assert_has_calls(
+            [
+                call("file1.txt", self.destination_dir, "/previous"),
+                call("folder1/", self.destination_dir, "/previous"),
+            ]
+        )
+        self.file_system.flush.assert_not_called()
+
     def test_delete_files_empty_selection(self):
         """
         Teste le cas où aucun fichier n'est sélectionné pour suppression.
@@ -387,5 +473,27 @@ class TestFileManager(unittest.TestCase):
         self.ui.error.assert_called_with("Copy: File not found")
 
 
+
+class TestConsoleUI(unittest.TestCase):
+    def test_error_reaches_console(self):
+        """Vérifie qu'une erreur de vérification est affichée sans planter."""
+        file_selection = MagicMock(spec=FileSelection)
+        file_selection.get_and_reset.return_value = ["file1.txt"]
+        file_system = MagicMock(spec=FileSystem)
+        file_system.copy.side_effect = ValueError("file1.txt: checksum mismatch")
+        file_manager = FileManager(
+            sel=file_selection, fs=file_system, ui=ConsoleUI(), destination="."
+        )
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout(output), patch("os.path.exists"), patch(
+            "os.path.isdir"
+        ):
+            count = file_manager.copy_files(".", verify=True)
+
+        self.assertEqual(count, 0)
+        self.assertIn("checksum mismatch", output.getvalue())
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,109 @@
+import unittest, os, sys, shutil, tempfile
+from correction import listing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from app.components.fileSystem import listing_store  # noqa: E402
+
+
+class ListingStoreTests:
+    """Tests communs au store de la correction et à celui de l'application."""
+
+    module = listing
+
+    def setUp(self):
+        """Crée un dossier avec un fichier, un sous-dossier et un nom accentué."""
+        self.test_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.test_dir, "folder"))
+        for name in ("file.txt", "été.md"):
+            with open(os.path.join(self.test_dir, name), "w") as f:
+                f.write("content")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_scan_matches_listdir(self):
+        """Vérifie que le store restitue les mêmes noms que os.listdir."""
+        store = self.module.ListingStore.scan(self.test_dir)
+
+        self.assertEqual(list(store), os.listdir(self.test_dir))
+        self.assertEqual(store, os.listdir(self.test_dir))
+        self.assertEqual(len(store), 3)
+
+    def test_scan_keeps_entry_types(self):
+        """Vérifie que le type de chaque entrée est conservé sans stat."""
+        store = self.module.ListingStore.scan(self.test_dir)
+
+        self.assertTrue(store.is_dir(store.index("folder")))
+        self.assertEqual(store.kinds[store.index("file.txt")], self.module.KIND_FILE)
+        self.assertEqual(store.kinds[store.index("folder")], self.module.KIND_DIR)
+        self.assertEqual(store.sizes[store.index("file.txt")], -1)
+
+    def test_scan_with_stat(self):
+        """Vérifie que taille et date sont renseignées quand elles sont demandées."""
+        store = self.module.ListingStore.scan(self.test_dir, with_stat=True)
+        index = store.index("file.txt")
+        st = os.stat(os.path.join(self.test_dir, "file.txt"))
+
+        self.assertEqual(store.sizes[index], 7)
+        self.assertEqual(store.mtimes[index], st.st_mtime)
+
+    def test_undecodable_name(self):
+        """Vérifie qu'un nom non décodable fait l'aller-retour à l'identique."""
+        name = os.fsdecode(b"caf\xe9")
+        store = self.module.ListingStore.from_names(self.test_dir, ["a", name, "b"])
+
+        self.assertEqual(store[1], name)
+        self.assertEqual(store[-1], "b")
+        self.assertEqual(store[0:2], ["a", name])
+        with self.assertRaises(IndexError):
+            store[3]
+
+
+class TestListingStore(ListingStoreTests, unittest.TestCase):
+    pass
+
+
+class TestAppListingStore(ListingStoreTests, unittest.TestCase):
+    module = listing_store
+
+
+class SelectionTests:
+    """Tests communs aux deux implémentations de la sélection."""
+
+    module = listing
+
+    def test_paths_are_built_from_indices(self):
+        """Vérifie qu'une sélection ne garde que des indices jusqu'à l'exécution."""
+        store = self.module.ListingStore.from_names("/data", ["a", "b", "c"])
+
+        selection = self.module.Selection(store, [2, 0])
+
+        self.assertEqual(selection.indices.tolist(), [2, 0])
+        self.assertEqual(
+            selection.paths(),
+            [os.path.join("/data", "c"), os.path.join("/data", "a")],
+        )
+
+    def test_from_paths(self):
+        """Vérifie la sélection de chemins quelconques."""
+        selection = self.module.Selection.from_paths(["/x/a", "/y/b"])
+
+        self.assertEqual(len(selection), 2)
+        self.assertEqual(selection.paths(), ["/x/a", "/y/b"])
+
+    def test_empty_selection(self):
+        """Vérifie qu'une sélection vide ne produit aucun chemin."""
+        self.assertEqual(self.module.Selection().paths(), [])
+
+
+class TestSelection(SelectionTests, unittest.TestCase):
+    pass
+
+
+class TestAppSelection(SelectionTests, unittest.TestCase):
+    module = listing_store
+
+
+if __name__ == "__main__":
+    unittest.main()
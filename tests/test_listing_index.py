@@ -0,0 +1,91 @@
+import unittest, os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from app.components.fileSystem.listing_index import (  # noqa: E402
+    IncrementalFilter,
+    ListingIndex,
+)
+
+
+class TestListingIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = ListingIndex(["cab.txt", "abc", "xab", "Backup", "zzz"])
+
+    def search(self, query, mode, within=None):
+        return list(self.index.search(query, mode, within))
+
+    def test_single_character_substring(self):
+        """Vérifie qu'un seul caractère trouve tous les noms qui le contiennent."""
+        self.assertEqual(self.search("b", "substring"), [0, 1, 2, 3])
+
+    def test_two_character_substring(self):
+        """Vérifie qu'une requête courte ne se limite pas aux préfixes."""
+        self.assertEqual(self.search("ab", "substring"), [0, 1, 2])
+        self.assertEqual(self.search("ac", "substring"), [3])
+
+    def test_longer_substring(self):
+        """Vérifie la recherche d'une sous-chaîne sans tenir compte de la casse."""
+        self.assertEqual(self.search("BAC", "substring"), [3])
+        self.assertEqual(self.search(".txt", "substring"), [0])
+        self.assertEqual(self.search("abz", "substring"), [])
+
+    def test_fuzzy_narrows_as_query_grows(self):
+        """Vérifie qu'un caractère de plus ne fait qu'affiner le flou."""
+        self.assertEqual(self.search("ac", "fuzzy"), [1, 3])
+        self.assertEqual(self.search("acp", "fuzzy"), [3])
+        self.assertEqual(self.search("bk", "fuzzy"), [3])
+
+    def test_refines_previous_matches(self):
+        """Vérifie que seuls les résultats précédents sont affinés."""
+        self.assertEqual(self.search("abc", "substring", within=[2, 3]), [])
+        self.assertEqual(self.search("bk", "fuzzy", within=[0, 3]), [3])
+
+    def test_prefix_in_listing_order(self):
+        """Vérifie que les préfixes sont rendus dans l'ordre du listing."""
+        index = ListingIndex(["bb", "ba", "a", "bc"])
+
+        self.assertEqual(list(index.prefix("b")), [0, 1, 3])
+        self.assertEqual(list(index.search("B", "prefix")), [0, 1, 3])
+
+    def test_long_prefix_refines_matches(self):
+        """Vérifie qu'un préfixe long affine les résultats du précédent."""
+        index = ListingIndex(["abcd", "ab", "abce", "a", "xabc"])
+
+        self.assertEqual(list(index.prefix("a")), [0, 1, 2, 3])
+        self.assertEqual(list(index.prefix("abc")), [0, 2])
+        self.assertEqual(list(index.prefix("abc", within=[2, 4])), [2])
+        self.assertEqual(list(index.prefix("abcdz")), [])
+
+    def test_unknown_characters(self):
+        """Vérifie qu'un caractère absent du listing ne trouve rien."""
+        for mode in ("prefix", "substring", "fuzzy"):
+            self.assertEqual(self.search("é", mode), [])
+            self.assertEqual(self.search("aé", mode), [])
+
+
+class TestIncrementalFilter(unittest.TestCase):
+    def setUp(self):
+        self.index = ListingIndex(["cab.txt", "abc", "xab", "Backup", "zzz"])
+
+    def test_type_and_backspace(self):
+        """Vérifie que chaque caractère affine et que l'effacement restaure."""
+        live_filter = IncrementalFilter(self.index)
+        self.assertIsNone(live_filter.matches)
+
+        self.assertEqual(list(live_filter.type("a")), [0, 1, 2, 3])
+        self.assertEqual(list(live_filter.type("b")), [0, 1, 2])
+        self.assertEqual(list(live_filter.type("c")), [1])
+        self.assertEqual(list(live_filter.backspace()), [0, 1, 2])
+        self.assertEqual(live_filter.query, "ab")
+
+    def test_matches_same_as_full_search(self):
+        """Vérifie que l'affinage équivaut à une recherche complète."""
+        names = [f"{word}_{i}.txt" for i in range(50) for word in ("draft", "data")]
+        index = ListingIndex(names)
+        for mode in ("prefix", "substring", "fuzzy"):
+            live_filter = IncrementalFilter(index, mode)
+            for char in "dat_1" if mode != "prefix" else "data_1":
+                live_filter.type(char)
+                expected = ListingIndex(names).search(live_filter.query, mode)
+                self.assertEqual(list(live_filter.matches), list(expected))
@@ -0,0 +1,105 @@
+import unittest
+from unittest.mock import MagicMock
+from correction.futils import FileExplorer, FileManager, FileSelection
+from correction.memfs import MemoryFileSystem
+from correction.ui import UserInterface
+
+
+class TestMemoryFileSystem(unittest.TestCase):
+    def setUp(self):
+        """Crée un petit arbre en mémoire."""
+        self.fs = MemoryFileSystem(clock=lambda: 42.0)
+        self.fs.makedirs("/docs/notes")
+        self.fs.write("/docs/a.txt", b"aaa")
+        self.fs.write("/docs/notes/b.txt", b"bb")
+
+    def names(self, path):
+        return sorted(entry.name for entry in self.fs.listdir(path))
+
+    def test_listdir_and_stat(self):
+        """Vérifie la liste d'un dossier et les métadonnées de ses entrées."""
+        entries = {entry.name: entry for entry in self.fs.listdir("/docs")}
+
+        self.assertEqual(sorted(entries), ["a.txt", "notes"])
+        self.assertEqual(entries["a.txt"].size, 3)
+        self.assertTrue(entries["notes"].is_dir)
+        self.assertEqual(self.fs.stat("/docs/a.txt").mtime, 42.0)
+        with self.assertRaises(FileNotFoundError):
+            self.fs.stat("/missing")
+        with self.assertRaises(NotADirectoryError):
+            self.fs.listdir("/docs/a.txt")
+
+    def test_read_errors_like_open(self):
+        """Vérifie que lire un chemin absent ou un dossier lève l'erreur d'open."""
+        for read in (self.fs.read, self.fs.open_read):
+            with self.assertRaises(FileNotFoundError):
+                read("/missing")
+            with self.assertRaises(IsADirectoryError):
+                read("/docs")
+
+    def test_copy_directory(self):
+        """Vérifie la copie d'un dossier dans un autre, contenu partagé."""
+        self.fs.makedirs("/backup")
+
+        self.fs.copy("/docs", "/backup")
+
+        self.assertEqual(self.names("/backup/docs"), ["a.txt", "notes"])
+        self.assertIs(self.fs.read("/backup/docs/a.txt"), self.fs.read("/docs/a.txt"))
+
+    def test_move_and_delete(self):
+        """Vérifie le déplacement puis la suppression d'un dossier."""
+        self.fs.move("/docs/notes", "/notes")
+        self.assertEqual(self.names("/"), ["docs", "notes"])
+        self.assertEqual(self.names("/docs"), ["a.txt"])
+
+        self.fs.delete("/notes")
+
+        self.assertEqual(self.names("/"), ["docs"])
+        self.assertNotIn("/notes/b.txt", self.fs.files)
+        self.assertNotIn("/notes", self.fs.children)
+
+    def test_move_into_itself(self):
+        """Vérifie qu'un dossier ne peut pas être déplacé dans lui-même."""
+        with self.assertRaises(OSError):
+            self.fs.move("/docs", "/docs/notes")
+
+    def test_open_write_replaces_on_close(self):
+        """Vérifie qu'un fichier n'est remplacé qu'à la fermeture réussie."""
+        with self.fs.open_write("/docs/a.txt") as f:
+            f.write(b"new")
+            self.assertEqual(self.fs.read("/docs/a.txt"), b"aaa")
+        self.assertEqual(self.fs.read("/docs/a.txt"), b"new")
+
+        with self.assertRaises(RuntimeError):
+            with self.fs.open_write("/docs/a.txt") as f:
+                f.write(b"partial")
+                raise RuntimeError("interrupted")
+        self.assertEqual(self.fs.read("/docs/a.txt"), b"new")
+
+    def test_explorer_over_backend(self):
+        """Vérifie que l'explorateur liste et navigue dans le backend."""
+        explorer = FileExplorer(self.fs)
+        self.assertEqual(list(explorer.current_directory_contents), ["docs"])
+
+        explorer.navigate(0)
+        contents = explorer.current_directory_contents
+        index = list(contents).index("notes")
+        self.assertTrue(contents.is_dir(index))
+
+        explorer.navigate(index)
+        self.assertEqual(explorer.current_path, "/docs/notes")
+        self.assertEqual(explorer.subset([0]).paths(), ["/docs/notes/b.txt"])
+
+    def test_file_manager_between_memory_backends(self):
+        """Vérifie qu'un FileManager copie d'un backend mémoire à un autre."""
+        other = MemoryFileSystem()
+        selection = MagicMock(spec=FileSelection)
+        selection.get_and_reset.return_value = ["/docs"]
+        ui = MagicMock(spec=UserInterface)
+        manager = FileManager(selection, self.fs, ui, dest_fs=other)
+
+        count = manager.copy_files("/")
+
+        self.assertEqual(count, 1)
+        self.assertEqual(other.read("/docs/notes/b.txt"), b"bb")
+        ui.error.assert_not_called()
@@ -0,0 +1,359 @@
+import unittest, hashlib, threading, uuid
+from unittest.mock import MagicMock
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+from xml.etree import ElementTree
+from correction.futils import FileManager, FileSelection
+from correction.memfs import MemoryFileSystem
+from correction.s3fs import S3FileSystem
+from correction.ui import UserInterface
+
+BUCKET = "bucket"
+
+
+class StubS3Handler(BaseHTTPRequestHandler):
+    """Serveur S3 minimal en mémoire : objets, listes, copies et multipart."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def parse(self):
+        url = urlsplit(self.path)
+        bucket, _, key = unquote(url.path).lstrip("/").partition("/")
+        query = dict(parse_qsl(url.query, keep_blank_values=True))
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        return bucket, key, query, body
+
+    def reply(self, status, body=b"", headers=None, length=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body) if length is None else length))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def handle_one_request(self):
+        # Chaque requête passe par ici : signature et empreinte du corps
+        self.raw_requestline = self.rfile.readline(65537)
+        if not self.raw_requestline:
+            self.close_connection = True
+            return
+        if not self.parse_request():
+            return
+        bucket, key, query, body = self.parse()
+        auth = self.headers.get("Authorization", "")
+        payload = self.headers.get("x-amz-content-sha256")
+        if (
+            bucket != BUCKET
+            or not auth.startswith("AWS4-HMAC-SHA256 Credential=key/")
+            or payload != hashlib.sha256(body).hexdigest()
+        ):
+            self.reply(403, b"<Error><Code>AccessDenied</Code></Error>")
+            return
+        with self.server.lock:
+            self.server.requests.append((self.command, key, query))
+        getattr(self, f"handle_{self.command}")(key, query, body)
+        self.wfile.flush()
+
+    def handle_HEAD(self, key, query, body):
+        if key not in self.server.objects:
+            self.reply(404)
+            return
+        data = self.server.objects[key]
+        headers = {
+            "ETag": f'"{hashlib.md5(data).hexdigest()}"',
+            "Last-Modified": formatdate(usegmt=True),
+        }
+        self.reply(200, headers=headers, length=len(data))
+
+    def handle_GET(self, key, query, body):
+        if "list-type" in query:
+            self.list_objects(query)
+        elif key not in self.server.objects:
+            self.reply(404, b"<Error><Code>NoSuchKey</Code></Error>")
+        elif "Range" in self.headers:
+            start, end = self.headers["Range"][len("bytes=") :].split("-")
+            data = self.server.objects[key][int(start) : int(end) + 1]
+            self.reply(206, data)
+        else:
+            self.reply(200, self.server.objects[key])
+
+    def list_objects(self, query):
+        prefix = query.get("prefix", "")
+        delimiter = query.get("delimiter")
+        max_keys = min(int(query.get("max-keys", 1000)), self.server.page_size)
+        entries = []
+        for key in sorted(self.server.objects):
+            if not key.startswith(prefix):
+                continue
+            rest = key[len(prefix) :]
+            if delimiter and delimiter in rest:
+                common = prefix + rest.split(delimiter)[0] + delimiter
+                if ("prefix", common) not in entries:
+                    entries.append(("prefix", common))
+            else:
+                entries.append(("key", key))
+        start = int(query.get("continuation-token", 0))
+        page = entries[start : start + max_keys]
+        truncated = start + max_keys < len(entries)
+        xml = ['<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">']
+        for kind, name in page:
+            if kind == "key":
+                size = len(self.server.objects[name])
+                xml.append(
+                    f"<Contents><Key>{name}</Key><Size>{size}</Size>"
+                    "<LastModified>2024-01-01T00:00:00.000Z</LastModified></Contents>"
+                )
+            else:
+                xml.append(f"<CommonPrefixes><Prefix>{name}</Prefix></CommonPrefixes>")
+        xml.append(f"<IsTruncated>{str(truncated).lower()}</IsTruncated>")
+        if truncated:
+            token = start + max_keys
+            xml.append(f"<NextContinuationToken>{token}</NextContinuationToken>")
+        xml.append("</ListBucketResult>")
+        self.reply(200, "".join(xml).encode())
+
+    def copy_source(self):
+        source = unquote(self.headers["x-amz-copy-source"]).lstrip("/")
+        data = self.server.objects[source.partition("/")[2]]
+        if "x-amz-copy-source-range" in self.headers:
+            start, end = self.headers["x-amz-copy-source-range"][6:].split("-")
+            data = data[int(start) : int(end) + 1]
+        return data
+
+    def handle_PUT(self, key, query, body):
+        if "x-amz-copy-source" in self.headers:
+            body = self.copy_source()
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if "uploadId" in query:
+            with self.server.lock:
+                self.server.uploads[query["uploadId"]][int(query["partNumber"])] = (
+                    etag,
+                    body,
+                )
+        else:
+            self.server.objects[key] = body
+        self.reply(200, headers={"ETag": etag})
+
+    def handle_POST(self, key, query, body):
+        if "uploads" in query:
+            upload_id = uuid.uuid4().hex
+            self.server.uploads[upload_id] = {}
+            self.reply(200, f"<R><UploadId>{upload_id}</UploadId></R>".encode())
+            return
+        parts = self.server.uploads.pop(query["uploadId"])
+        data = b""
+        for part in ElementTree.fromstring(body).iter("Part"):
+            etag, chunk = parts[int(part.findtext("PartNumber"))]
+            assert etag == part.findtext("ETag")
+            data += chunk
+        self.server.objects[key] = data
+        self.server.completed += 1
+        self.reply(200, b"<CompleteMultipartUploadResult/>")
+
+    def handle_DELETE(self, key, query, body):
+        if "uploadId" in query:
+            self.server.uploads.pop(query["uploadId"], None)
+            self.server.aborted += 1
+        else:
+            self.server.objects.pop(key, None)
+        self.reply(204)
+
+
+class StubS3Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubS3Handler)
+        self.lock = threading.Lock()
+        self.objects = {}
+        self.uploads = {}
+        self.requests = []
+        self.connections = self.completed = self.aborted = 0
+        self.page_size = 1000
+
+
+class StubS3TestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubS3Server()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.endpoint = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.objects.clear()
+        self.server.requests.clear()
+        self.server.completed = self.server.aborted = 0
+        self.server.page_size = 1000
+        self.fs = S3FileSystem(
+            self.endpoint, BUCKET, "key", "secret", pool_size=4, part_size=1024
+        )
+
+    def tearDown(self):
+        self.fs.close()
+
+
+class TestS3FileSystem(StubS3TestCase):
+    def write(self, path, data):
+        with self.fs.open_write(path) as f:
+            f.write(data)
+
+    def read(self, path):
+        with self.fs.open_read(path) as f:
+            return f.read()
+
+    def test_small_file_single_request(self):
+        """Vérifie qu'un petit fichier est envoyé en une seule requête."""
+        self.write("/small.txt", b"hello")
+
+        self.assertEqual(self.server.objects["small.txt"], b"hello")
+        self.assertEqual(self.server.completed, 0)
+        self.assertEqual(self.read("/small.txt"), b"hello")
+
+    def test_multipart_upload_and_ranged_read(self):
+        """Vérifie l'envoi en plusieurs parties et la lecture par plages."""
+        data = bytes(range(256)) * 40 + b"tail"
+
+        self.write("/dir/big.bin", data)
+
+        self.assertEqual(self.server.completed, 1)
+        self.assertEqual(self.server.objects["dir/big.bin"], data)
+        self.assertEqual(self.read("/dir/big.bin"), data)
+        ranges = [r for r in self.server.requests if r[0] == "GET"]
+        self.assertEqual(len(ranges), 11)
+
+    def test_failed_upload_is_aborted(self):
+        """Vérifie qu'une écriture interrompue ne crée pas d'objet."""
+        with self.assertRaises(RuntimeError):
+            with self.fs.open_write("/broken.bin") as f:
+                f.write(b"x" * 3000)
+                raise RuntimeError("source failed")
+
+        self.assertNotIn("broken.bin", self.server.objects)
+        self.assertEqual(self.server.aborted, 1)
+
+    def test_listdir_and_stat(self):
+        """Vérifie la liste d'un dossier paginée et les métadonnées."""
+        self.server.page_size = 2
+        for key in ("a.txt", "b.txt", "sub/c.txt", "sub/d/e.txt"):
+            self.server.objects[key] = b"12345"
+
+        root = {entry.name: entry for entry in self.fs.listdir("/")}
+        sub = {entry.name: entry for entry in self.fs.listdir("/sub")}
+
+        self.assertEqual(sorted(root), ["a.txt", "b.txt", "sub"])
+        self.assertTrue(root["sub"].is_dir)
+        self.assertEqual(root["a.txt"].size, 5)
+        self.assertEqual(sorted(sub), ["c.txt", "d"])
+        self.assertEqual(self.fs.stat("/sub/c.txt").size, 5)
+        self.assertTrue(self.fs.stat("/sub/d").is_dir)
+        with self.assertRaises(FileNotFoundError):
+            self.fs.stat("/missing")
+
+    def test_server_side_copy_move_delete(self):
+        """Vérifie copie, déplacement et suppression côté serveur."""
+        self.server.objects.update({"src/a": b"aaa", "src/b/c": b"ccc", "dst/": b""})
+
+        self.fs.copy("/src", "/dst")
+        self.fs.move("/dst/src/a", "/moved")
+        self.fs.delete("/src")
+
+        self.assertEqual(
+            self.server.objects, {"dst/": b"", "dst/src/b/c": b"ccc", "moved": b"aaa"}
+        )
+        puts = [r for r in self.server.requests if r[0] == "PUT"]
+        self.assertEqual(len(puts), 3)
+
+    def test_large_copy_in_parts(self):
+        """Vérifie qu'un objet au-delà de la limite est copié par parties."""
+        self.fs.copy_limit = 2048
+        data = bytes(range(256)) * 20
+        self.server.objects["big"] = data
+
+        self.fs.copy("/big", "/copy")
+
+        self.assertEqual(self.server.objects["copy"], data)
+        self.assertEqual(self.server.completed, 1)
+
+    def test_connections_are_pooled(self):
+        """Vérifie que les connexions sont réutilisées d'une requête à l'autre."""
+        before = self.server.connections
+        for i in range(20):
+            self.write(f"/file{i}", b"data")
+        self.write("/big", b"x" * 10 * 1024)
+
+        self.assertLessEqual(self.server.connections - before, 4)
+
+    def test_wrong_bucket_is_denied(self):
+        """Vérifie qu'un refus du serveur devient une PermissionError."""
+        fs = S3FileSystem(self.endpoint, "other", "key", "secret")
+        with self.assertRaises(PermissionError):
+            fs.listdir("/")
+        fs.close()
+
+
+class TestCrossBackendTransfer(StubS3TestCase):
+    def setUp(self):
+        super().setUp()
+        self.memory = MemoryFileSystem()
+        self.memory.makedirs("/photos/2024")
+        self.memory.write("/photos/2024/a.jpg", b"a" * 5000)
+        self.memory.write("/photos/readme", b"readme")
+        self.selection = MagicMock(spec=FileSelection)
+        self.ui = MagicMock(spec=UserInterface)
+
+    def manager(self, fs, dest_fs):
+        return FileManager(self.selection, fs, self.ui, dest_fs=dest_fs)
+
+    def test_copy_memory_to_s3_and_back(self):
+        """Vérifie un aller-retour mémoire -> S3 -> mémoire du même arbre."""
+        self.selection.get_and_reset.return_value = ["/photos"]
+        count = self.manager(self.memory, self.fs).copy_files("/")
+
+        self.assertEqual(count, 1)
+        self.assertEqual(self.server.objects["photos/2024/a.jpg"], b"a" * 5000)
+
+        back = MemoryFileSystem()
+        back.makedirs("/restore")
+        self.selection.get_and_reset.return_value = ["/photos"]
+        count = self.manager(self.fs, back).copy_files("/restore")
+
+        self.assertEqual(count, 1)
+        self.assertEqual(back.read("/restore/photos/2024/a.jpg"), b"a" * 5000)
+        self.assertEqual(back.read("/restore/photos/readme"), b"readme")
+        self.ui.error.assert_not_called()
+
+    def test_move_to_s3_removes_source(self):
+        """Vérifie qu'un déplacement inter-backend supprime la source."""
+        self.selection.get_and_reset.return_value = ["/photos/readme"]
+
+        count = self.manager(self.memory, self.fs).move_files("/")
+
+        self.assertEqual(count, 1)
+        self.assertEqual(self.server.objects["readme"], b"readme")
+        with self.assertRaises(FileNotFoundError):
+            self.memory.stat("/photos/readme")
+
+    def test_missing_destination(self):
+        """Vérifie qu'une destination absente du backend est signalée."""
+        self.selection.get_and_reset.return_value = ["/photos/readme"]
+
+        count = self.manager(self.memory, self.fs).copy_files("/nowhere")
+
+        self.assertEqual(count, 0)
+        self.ui.error.assert_called_once_with("Destination path does not exist")
@@ -0,0 +1,133 @@
+import unittest, errno, os, shutil, socket, stat, tempfile
+from unittest.mock import patch
+from correction import snapshot
+from correction.snapshot import Snapshotter
+
+
+class TestSnapshotter(unittest.TestCase):
+    def setUp(self):
+        """Crée une petite arborescence source dans un dossier temporaire."""
+        self.test_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.test_dir, "source")
+        os.makedirs(os.path.join(self.source, "sub"))
+        self.write("a.txt", b"aaa")
+        self.write(os.path.join("sub", "b.txt"), b"bbb")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write(self, name, data):
+        with open(os.path.join(self.source, name), "wb") as f:
+            f.write(data)
+
+    def read(self, *parts):
+        with open(os.path.join(self.test_dir, *parts), "rb") as f:
+            return f.read()
+
+    def inode(self, *parts):
+        return os.stat(os.path.join(self.test_dir, *parts)).st_ino
+
+    def test_full_snapshot_independent_of_source(self):
+        """Vérifie qu'un premier snapshot ne partage aucun inode avec la source."""
+        snapshotter = Snapshotter()
+
+        snapshotter.snapshot(self.source, os.path.join(self.test_dir, "snap1"))
+        with open(os.path.join(self.source, "a.txt"), "r+b") as f:
+            f.write(b"x")
+
+        self.assertEqual(self.read("snap1", "a.txt"), b"aaa")
+        self.assertEqual(self.read("snap1", "sub", "b.txt"), b"bbb")
+        self.assertNotEqual(self.inode("snap1", "a.txt"), self.inode("source", "a.txt"))
+        self.assertEqual(snapshotter.stats["copy"] + snapshotter.stats["reflink"], 2)
+
+    def test_snapshot_twice_into_same_destination(self):
+        """Vérifie qu'un second snapshot au même endroit préserve la source."""
+        snap = os.path.join(self.test_dir, "snap1")
+        os.symlink("a.txt", os.path.join(self.source, "link"))
+        os.makedirs(snap)
+        # Destination liée à la source, comme après un ancien snapshot
+        os.link(os.path.join(self.source, "a.txt"), os.path.join(snap, "a.txt"))
+
+        Snapshotter().snapshot(self.source, snap)
+        Snapshotter().snapshot(self.source, snap)
+
+        self.assertEqual(self.read("source", "a.txt"), b"aaa")
+        self.assertEqual(self.read("snap1", "a.txt"), b"aaa")
+        self.assertEqual(os.readlink(os.path.join(snap, "link")), "a.txt")
+        self.assertEqual(sorted(os.listdir(snap)), ["a.txt", "link", "sub"])
+
+    def test_incremental_snapshot(self):
+        """
+        Vérifie le mode incrémental :
+        - un fichier inchangé est lié au snapshot précédent ;
+        - un fichier modifié reçoit sa propre copie.
+        """
+        first = os.path.join(self.test_dir, "snap1")
+        Snapshotter().snapshot(self.source, first, os.path.join(self.test_dir, "none"))
+        self.write("a.txt", b"changed")
+        os.utime(os.path.join(self.source, "a.txt"), (1, 1))
+
+        snapshotter = Snapshotter()
+        snapshotter.snapshot(self.source, os.path.join(self.test_dir, "snap2"), first)
+
+        self.assertEqual(snapshotter.stats["previous"], 1)
+        self.assertEqual(
+            self.inode("snap2", "sub", "b.txt"), self.inode("snap1", "sub", "b.txt")
+        )
+        self.assertEqual(self.read("snap1", "a.txt"), b"aaa")
+        self.assertEqual(self.read("snap2", "a.txt"), b"changed")
+        self.assertNotEqual(
+            self.inode("snap2", "a.txt"), self.inode("source", "a.txt")
+        )
+
+    def test_snapshot_single_file(self):
+        """Vérifie qu'un fichier seul peut être capturé."""
+        Snapshotter().snapshot(
+            os.path.join(self.source, "a.txt"), os.path.join(self.test_dir, "a.bak")
+        )
+
+        self.assertEqual(self.read("a.bak"), b"aaa")
+
+    def test_special_files_not_opened(self):
+        """Vérifie qu'un tube nommé est recréé et qu'une socket est ignorée."""
+        os.mkfifo(os.path.join(self.source, "pipe"))
+        sock = socket.socket(socket.AF_UNIX)
+        self.addCleanup(sock.close)
+        sock.bind(os.path.join(self.source, "sock"))
+        snapshotter = Snapshotter()
+
+        snapshotter.snapshot(self.source, os.path.join(self.test_dir, "snap1"))
+
+        pipe = os.stat(os.path.join(self.test_dir, "snap1", "pipe"))
+        self.assertTrue(stat.S_ISFIFO(pipe.st_mode))
+        self.assertFalse(os.path.lexists(os.path.join(self.test_dir, "snap1", "sock")))
+        self.assertEqual(snapshotter.skipped, [os.path.join(self.source, "sock")])
+        self.assertEqual(snapshotter.stats["special"], 1)
+
+    def test_reflink_unsupported_remembered(self):
+        """Vérifie qu'un refus du système de fichiers évite les essais suivants."""
+        snapshotter = Snapshotter()
+        error = OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+        with patch.object(snapshot.fcntl, "ioctl", side_effect=error) as ioctl:
+            snapshotter.snapshot(self.source, os.path.join(self.test_dir, "snap1"))
+
+        ioctl.assert_called_once()
+        self.assertEqual(snapshotter.stats["copy"], 2)
+
+    def test_reflink_file_error_not_remembered(self):
+        """Vérifie qu'une erreur propre à un fichier n'est pas mise en cache."""
+        snapshotter = Snapshotter()
+        error = OSError(errno.ENOSPC, "No space left on device")
+
+        with patch.object(snapshot.fcntl, "ioctl", side_effect=error):
+            with self.assertRaises(OSError):
+                snapshotter.snapshot(self.source, os.path.join(self.test_dir, "snap1"))
+
+        self.assertNotIn(False, snapshotter._reflink_devices.values())
+        for _, _, files in os.walk(self.test_dir):
+            self.assertEqual([name for name in files if name.endswith(".tmp")], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest, os, sys, shutil, tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from app.components.fileSystem.sparse_copy import (  # noqa: E402
+    copy_sparse,
+    data_extents,
+)
+
+MIB = 1024 * 1024
+
+
+class TestSparseCopy(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.sparse = os.path.join(self.test_dir, "disk.img")
+        with open(self.sparse, "wb") as f:
+            f.truncate(8 * MIB)
+            f.seek(3 * MIB)
+            f.write(b"data" * 1024)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_copy_keeps_holes(self):
+        """
+        Vérifie qu'un fichier creux reste creux après la copie :
+        - le contenu est identique, trous compris ;
+        - la destination n'occupe pas plus de blocs que la source.
+        """
+        dest = copy_sparse(self.sparse, os.path.join(self.test_dir, "copy.img"))
+
+        self.assertEqual(self.read(dest), self.read(self.sparse))
+        self.assertLessEqual(os.stat(dest).st_blocks, os.stat(self.sparse).st_blocks)
+
+    def test_holes_are_not_read(self):
+        """Vérifie que seules les plages de données sont lues."""
+        with open(self.sparse, "rb") as f:
+            extents = list(data_extents(f.fileno(), 8 * MIB))
+
+        if os.stat(self.sparse).st_blocks * 512 >= 8 * MIB:
+            self.skipTest("le système de fichiers ne crée pas de trous")
+        self.assertLess(sum(end - start for start, end in extents), MIB)
+        self.assertLessEqual(extents[0][0], 3 * MIB)
+
+    def test_copy_into_directory(self):
+        """Vérifie la copie d'un fichier plein dans un dossier, dates comprises."""
+        source = os.path.join(self.test_dir, "full.txt")
+        with open(source, "wb") as f:
+            f.write(b"content")
+        os.utime(source, (1_000_000, 1_000_000))
+        folder = os.path.join(self.test_dir, "folder")
+        os.makedirs(folder)
+
+        dest = copy_sparse(source, folder)
+
+        self.assertEqual(dest, os.path.join(folder, "full.txt"))
+        self.assertEqual(self.read(dest), b"content")
+        self.assertEqual(os.stat(dest).st_mtime, 1_000_000)
+
+    def test_trailing_hole(self):
+        """Vérifie qu'un trou final garde la taille du fichier."""
+        with open(self.sparse, "r+b") as f:
+            f.truncate(16 * MIB)
+
+        dest = copy_sparse(self.sparse, os.path.join(self.test_dir, "copy.img"))
+
+        self.assertEqual(os.path.getsize(dest), 16 * MIB)
@@ -0,0 +1,56 @@
+import unittest, os, sys, json, subprocess, tempfile, time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+
+# Time allowed between the start of the import and the menu being shown
+STARTUP_BUDGET = 0.25
+# Whole interpreter, startup of Python itself included
+PROCESS_BUDGET = 2.0
+# Modules only needed once an operation runs, never to show the menu
+HEAVY_MODULES = (
+    "shutil",
+    "tarfile",
+    "concurrent.futures",
+    "multiprocessing",
+    "mmap",
+)
+
+PROBE = """
+import json, sys, time, io, contextlib
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    import main
+    main.Menu().display_commands()
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+class TestStartup(unittest.TestCase):
+    def run_probe(self):
+        """Lance l'application dans un nouvel interpréteur et mesure le menu."""
+        # An empty bytecode cache makes every run a first launch
+        with tempfile.TemporaryDirectory() as cache:
+            result = subprocess.run(
+                [sys.executable, "-c", PROBE],
+                cwd=SRC_DIR,
+                capture_output=True,
+                text=True,
+                timeout=PROCESS_BUDGET * 5,
+                env={**os.environ, "PYTHONPYCACHEPREFIX": cache},
+            )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def test_cold_start_within_budget(self):
+        """Vérifie qu'un premier lancement affiche le menu dans le budget."""
+        start = time.perf_counter()
+        elapsed = self.run_probe()["elapsed"]
+        self.assertLess(elapsed, STARTUP_BUDGET)
+        self.assertLess(time.perf_counter() - start, PROCESS_BUDGET)
+
+    def test_heavy_modules_deferred(self):
+        """Vérifie que les modules lourds ne sont pas importés au démarrage."""
+        modules = self.run_probe()["modules"]
+        for name in HEAVY_MODULES:
+            self.assertNotIn(name, modules)
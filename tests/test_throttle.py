@@ -0,0 +1,177 @@
+import unittest, os, shutil, tempfile
+from unittest.mock import ANY, MagicMock, call
+from correction.futils import FileSystem
+from correction.throttle import TokenBucket, ThrottledFileSystem
+
+
+class FakeClock:
+    """Horloge simulée : dormir fait simplement avancer le temps."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_acquire_within_burst_does_not_wait(self):
+        """Vérifie que la capacité initiale est consommée sans attente."""
+        bucket = TokenBucket(100, clock=self.clock, sleep=self.clock.sleep)
+
+        bucket.acquire(100)
+
+        self.assertEqual(self.clock.now, 0)
+
+    def test_acquire_waits_for_refill(self):
+        """Vérifie que le débit moyen respecte la limite configurée."""
+        bucket = TokenBucket(100, clock=self.clock, sleep=self.clock.sleep)
+
+        for _ in range(3):
+            bucket.acquire(100)
+
+        self.assertAlmostEqual(self.clock.now, 2.0)
+
+    def test_unlimited_bucket(self):
+        """Vérifie qu'un seau sans débit ne bloque jamais."""
+        bucket = TokenBucket(None, clock=self.clock, sleep=self.clock.sleep)
+
+        bucket.acquire(10**9)
+
+        self.assertEqual(self.clock.now, 0)
+
+    def test_set_rate_while_running(self):
+        """Vérifie qu'un changement de débit s'applique aux demandes suivantes."""
+        bucket = TokenBucket(10, clock=self.clock, sleep=self.clock.sleep)
+        bucket.acquire(10)
+
+        bucket.set_rate(1000)
+        bucket.acquire(1000)
+
+        self.assertAlmostEqual(self.clock.now, 1.0)
+
+    def test_rate_must_be_positive(self):
+        """Vérifie qu'un débit nul ou négatif est refusé sans rien changer."""
+        for rate in (0, -5):
+            with self.assertRaises(ValueError):
+                TokenBucket(rate, clock=self.clock, sleep=self.clock.sleep)
+        bucket = TokenBucket(10, clock=self.clock, sleep=self.clock.sleep)
+
+        with self.assertRaises(ValueError):
+            bucket.set_rate(0)
+        bucket.consume(20)
+
+        self.assertEqual(bucket.rate, 10)
+        self.assertAlmostEqual(self.clock.now, 1.0)
+
+
+class TestThrottledFileSystem(unittest.TestCase):
+    # Taille copiée par la copie simulée
+    size = 100
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.test_dir, "source.bin")
+        with open(self.source, "wb") as f:
+            f.write(b"x" * 100)
+        self.clock = FakeClock()
+        self.inner = MagicMock(spec=FileSystem)
+        self.writes = []
+        self.inner.copy.side_effect = self.chunked_copy
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def chunked_copy(self, src, dest, progress=None, **options):
+        """Copie simulée : annonce chaque bloc de 100 octets puis l'écrit."""
+        for _ in range(self.size // 100):
+            progress(100)
+            self.writes.append(self.clock.now)
+
+    def make_fs(self, **limits):
+        return ThrottledFileSystem(
+            self.inner, clock=self.clock, sleep=self.clock.sleep, **limits
+        )
+
+    def test_copy_respects_bandwidth(self):
+        """Vérifie que la copie est limitée en octets par seconde."""
+        fs = self.make_fs(bytes_per_second=100)
+
+        for _ in range(3):
+            fs.copy(self.source, self.test_dir)
+
+        self.assertAlmostEqual(self.clock.now, 2.0)
+        self.inner.copy.assert_has_calls(
+            [call(self.source, self.test_dir, progress=ANY)] * 3
+        )
+
+    def test_large_copy_paced_per_chunk(self):
+        """Vérifie qu'une grosse copie est ralentie bloc par bloc, pas après."""
+        self.size = 1000
+        fs = self.make_fs(bytes_per_second=100)
+
+        fs.copy(self.source, self.test_dir)
+
+        # Le premier bloc part avec le seau plein, chaque suivant attend 1 s
+        self.assertEqual(len(self.writes), 10)
+        for expected, written in zip(range(10), self.writes):
+            self.assertAlmostEqual(written, expected)
+
+    def test_chunk_bigger_than_bucket_waits_first(self):
+        """Vérifie qu'un bloc plus gros que le seau attend avant l'écriture."""
+        self.size = 1000
+        fs = self.make_fs(bytes_per_second=10)
+        self.inner.copy.side_effect = lambda src, dest, progress: (
+            progress(1000),
+            self.writes.append(self.clock.now),
+        )
+
+        fs.copy(self.source, self.test_dir)
+
+        self.assertAlmostEqual(self.writes[0], 99.0)
+
+    def test_delete_respects_iops(self):
+        """Vérifie que les suppressions sont limitées en opérations par seconde."""
+        fs = self.make_fs(ops_per_second=2)
+
+        for _ in range(4):
+            fs.delete(self.source)
+
+        self.assertAlmostEqual(self.clock.now, 1.0)
+        self.assertEqual(self.inner.delete.call_count, 4)
+
+    def test_destination_budget(self):
+        """Vérifie que seul le budget de la destination concernée s'applique."""
+        fs = self.make_fs()
+        slow = os.path.join(self.test_dir, "slow")
+        fs.set_destination_limit(slow, bytes_per_second=50)
+
+        fs.copy(self.source, self.test_dir)
+        self.assertEqual(self.clock.now, 0)
+
+        fs.copy(self.source, os.path.join(slow, "sub"))
+        fs.copy(self.source, os.path.join(slow, "sub"))
+        # 200 octets à 50 o/s, dont 50 d'avance : rien n'est écrit à crédit
+        self.assertAlmostEqual(self.clock.now, 3.0)
+
+    def test_invalid_limits_change_nothing(self):
+        """Vérifie qu'une limite invalide laisse les deux débits intacts."""
+        fs = self.make_fs(bytes_per_second=100, ops_per_second=10)
+
+        with self.assertRaises(ValueError):
+            fs.set_limits(bytes_per_second=200, ops_per_second=0)
+        with self.assertRaises(ValueError):
+            fs.set_destination_limit(self.test_dir, bytes_per_second=-1)
+
+        self.assertEqual((fs.bandwidth.rate, fs.iops.rate), (100, 10))
+        self.assertEqual(fs.destination_budgets, {})
+
+
+if __name__ == "__main__":
+    unittest.main()